@@ -0,0 +1,115 @@
+"""
+Materialized catalog aggregates (tb_catalog_stats, tb_category_stats).
+refresh_aggregates() recomputes totals, average/min/max price, price
+percentiles, stock totals and the rating distribution, overall and per
+category, whenever the catalog changes: it runs right after
+app.ingest.bump_dataset_version in the same transaction, so the stats
+endpoints read one row (or one small table) that always matches tb_books.
+"""
+
+from datetime import datetime
+from typing import Sequence
+from sqlalchemy import Select, delete, func, insert, select
+from sqlalchemy.orm import Session
+from . import models
+
+PERCENTILES = {"median_price": 0.5, "p90_price": 0.9}
+
+
+def _interpolate(values: Sequence[float], position: float) -> float:
+    # values[0] is the value at floor(position), values[1] (if any) the next one
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return float(values[0])
+    return values[0] + (values[1] - values[0]) * (position - int(position))
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """
+    Linearly interpolated percentile of sorted values (like percentile_cont).
+    """
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    return _interpolate(sorted_values[lower : lower + 2], position)
+
+
+def _percentiles(db: Session, prices: Select, count: int) -> dict:
+    # Two rows per percentile from an index-ordered price scan, so no
+    # dialect-specific aggregate is needed.
+    result = {}
+    for name, fraction in PERCENTILES.items():
+        position = (count - 1) * fraction if count else 0
+        values = db.scalars(prices.offset(int(position)).limit(2)).all()
+        result[name] = _interpolate(values, position)
+    return result
+
+
+def refresh_aggregates(db: Session):
+    """
+    Recompute all aggregates of tb_books in the current transaction.
+    Accepts a Session or a Connection.
+    Concurrent refreshes are serialized by the dataset version row lock
+    taken by bump_dataset_version beforehand.
+    """
+    book = models.Book
+    now = datetime.utcnow()
+    version = db.scalar(
+        select(models.DatasetVersion.version).where(models.DatasetVersion.id == 1)
+    )
+    total, average, low, high, stock = db.execute(
+        select(
+            func.count(book.id),
+            func.avg(book.price_incl_tax),
+            func.min(book.price_incl_tax),
+            func.max(book.price_incl_tax),
+            func.sum(book.num_available),
+        )
+    ).one()
+    ratings = db.execute(
+        select(book.rating, func.count(book.id))
+        .group_by(book.rating)
+        .order_by(book.rating)
+    ).all()
+    categories = db.execute(
+        select(
+            book.category,
+            func.count(book.id),
+            func.avg(book.price_incl_tax),
+            func.sum(book.num_available),
+        )
+        .group_by(book.category)
+        .order_by(book.category)
+    ).all()
+
+    prices = select(book.price_incl_tax).order_by(book.price_incl_tax)
+    db.execute(delete(models.CatalogStats))
+    db.execute(
+        insert(models.CatalogStats).values(
+            id=1,
+            version=version or 0,
+            total_books=total,
+            average_price=float(average or 0.0),
+            min_price=float(low or 0.0),
+            max_price=float(high or 0.0),
+            total_stock=stock or 0,
+            rating_distribution={str(rating): count for rating, count in ratings},
+            computed_ts=now,
+            **_percentiles(db, prices, total),
+        )
+    )
+    db.execute(delete(models.CategoryStats))
+    rows = [
+        {
+            "category": category,
+            "total_books": count,
+            "average_price": float(category_average or 0.0),
+            "total_stock": category_stock or 0,
+            **_percentiles(db, prices.where(book.category == category), count),
+        }
+        for category, count, category_average, category_stock in categories
+    ]
+    if rows:
+        db.execute(insert(models.CategoryStats), rows)
@@ -0,0 +1,159 @@
+"""
+Async CRUD reads for the API routers.
+Statements are shared with the sync functions in app.crud, so both return
+the same results; writes stay in app.crud. Reads the catalog snapshot can
+answer are served from memory when it is enabled (see app.snapshot);
+otherwise aggregates are cached per dataset version (see app.response_cache).
+Book lists are returned as plain dicts (see app.fast_json). Concurrent
+identical reads share one query (see app.singleflight).
+"""
+
+from typing import List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import crud, models, schemas
+from app.fast_json import fetch_books
+from app.response_cache import response_cache
+from app.singleflight import coalesce
+from app.snapshot import catalog_snapshot
+
+
+@coalesce
+async def get_books(db: AsyncSession, skip: int = 0, limit: int = 10) -> List[dict]:
+    """
+    Retrieve a paginated list of books from the database.
+    """
+    return await fetch_books(db, crud.books_statement(skip, limit))
+
+
+@coalesce
+async def get_books_page(
+    db: AsyncSession,
+    sort: str = "id",
+    descending: bool = False,
+    cursor: str = None,
+    limit: int = 10,
+    skip: int = 0,
+) -> Tuple[List[models.Book], str]:
+    """
+    Retrieve a page of books and the cursor of the next page (None at the end).
+    """
+    stmt = crud.books_page_statement(sort, descending, cursor, limit, skip)
+    books = (await db.scalars(stmt)).all()
+    return books, crud.next_cursor(books, sort, descending, limit)
+
+
+@coalesce
+async def get_book_by_id(db: AsyncSession, book_id: int) -> models.Book:
+    """
+    Retrieve a book by its ID.
+    """
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        return snapshot.get(book_id)
+    return (await db.scalars(crud.book_by_id_statement(book_id))).first()
+
+
+@coalesce
+async def search_books(
+    db: AsyncSession,
+    title: str = None,
+    category: str = None,
+    skip: int = 0,
+    limit: int = None,
+) -> List[dict]:
+    """
+    Search books by title and/or category.
+    """
+    stmt = crud.search_books_statement(title, category, skip, limit)
+    return await fetch_books(db, stmt)
+
+
+@coalesce
+async def search_books_by_price(
+    db: AsyncSession,
+    min: float = None,
+    max: float = None,
+    skip: int = 0,
+    limit: int = None,
+) -> List[dict]:
+    """
+    Search books by price range.
+    """
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        return snapshot.price_range(min, max, skip, limit)
+    stmt = crud.price_range_statement(min, max, skip, limit)
+    return await fetch_books(db, stmt)
+
+
+@coalesce
+async def get_dataset_version(db: AsyncSession) -> int:
+    """
+    Current dataset version of the catalog (0 before the first ingest).
+    """
+    return (await db.scalar(crud.dataset_version_statement())) or 0
+
+
+@coalesce
+async def get_categories(db: AsyncSession) -> List[str]:
+    """
+    Retrieve all unique book categories.
+    """
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        return snapshot.categories()
+
+    async def load():
+        return list((await db.scalars(crud.categories_statement())).all())
+
+    version = await get_dataset_version(db)
+    return await response_cache.get_or_load("categories", version, load)
+
+
+@coalesce
+async def get_stats_overview(db: AsyncSession) -> schemas.BookStatsOverview:
+    """
+    Get overview statistics for books: totals, price statistics, rating
+    distribution.
+    """
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        return snapshot.overview
+
+    async def load():
+        stats = (await db.scalars(crud.catalog_stats_statement())).first()
+        return crud.build_stats_overview(stats).model_dump()
+
+    version = await get_dataset_version(db)
+    overview = await response_cache.get_or_load("stats_overview", version, load)
+    return schemas.BookStatsOverview(**overview)
+
+
+@coalesce
+async def get_category_overview(db: AsyncSession) -> List[dict]:
+    """
+    Get statistics by category: total books, price statistics and stock.
+    """
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        return snapshot.category_stats
+
+    async def load():
+        results = (await db.execute(crud.category_stats_statement())).all()
+        return crud.build_category_stats(results)
+
+    version = await get_dataset_version(db)
+    return await response_cache.get_or_load("category_overview", version, load)
+
+
+@coalesce
+async def get_top_rated(
+    db: AsyncSession, skip: int = 0, limit: int = None
+) -> List[dict]:
+    """
+    Retrieve books with the highest rating (5).
+    """
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None:
+        return snapshot.top_rated(skip, limit)
+    return await fetch_books(db, crud.top_rated_statement(skip, limit))
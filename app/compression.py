@@ -0,0 +1,132 @@
+"""
+Negotiated response compression (brotli or gzip).
+Responses of at least COMPRESSION_MIN_BYTES (default 1024) are compressed
+with the best encoding the client accepts: br (quality BROTLI_QUALITY,
+default 4) when the optional brotli package is installed, else gzip
+(level GZIP_LEVEL, default 6). Streamed responses are compressed chunk by
+chunk. Builds on Starlette's GZip responders; compressed responses get an
+encoding suffix on their ETag so it stays a strong validator.
+"""
+
+import os
+import re
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional dependency
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", 1024))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", 4))
+
+ENCODED_ETAG_RE = re.compile(r'-(?:br|gzip)"$')
+
+
+def identity_etag(etag: str) -> str:
+    """
+    The ETag of the uncompressed representation.
+    """
+    return ENCODED_ETAG_RE.sub('"', etag)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """
+    Preferred supported encoding of an Accept-Encoding header ("br",
+    "gzip"), or None for identity. Ties go to br.
+    """
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip()] = weight
+    best, best_weight = None, 0.0
+    for coding in supported:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class _EncodedETag:
+    """
+    Responder mixin: suffix the ETag of responses it compressed.
+    """
+
+    content_encoding: str
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async def send_tagged(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                etag = headers.get("etag")
+                if etag and headers.get("content-encoding") == self.content_encoding:
+                    headers["ETag"] = etag[:-1] + f'-{self.content_encoding}"'
+            await send(message)
+
+        await super().__call__(scope, receive, send_tagged)
+
+
+class GzipResponder(_EncodedETag, GZipResponder):
+    pass
+
+
+class BrotliResponder(_EncodedETag, IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = 4) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        compressed = self.compressor.process(body)
+        if more_body:
+            # Flush so each streamed chunk reaches the client right away.
+            return compressed + self.compressor.flush()
+        return compressed + self.compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with the negotiated encoding.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_BYTES,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding == "br":
+            responder = BrotliResponder(
+                self.app, self.minimum_size, quality=self.brotli_quality
+            )
+        elif encoding == "gzip":
+            responder = GzipResponder(
+                self.app, self.minimum_size, compresslevel=self.gzip_level
+            )
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
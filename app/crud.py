@@ -3,27 +3,281 @@ CRUD operations for Book and RequestLog models.
 Provides database interaction functions for books and request logging.
 """
 
-from typing import List
+import base64
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Select, and_, func, insert, or_, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from . import models, schemas
+from .aggregates import refresh_aggregates
+from .ingest import SnapshotIngest, bump_dataset_version
+
+UPSERT_BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+def _upsert(db: Session, model, rows: List[dict], key: str):
+    """
+    Insert rows, updating every non-key column when the key already exists.
+    Uses INSERT ... ON CONFLICT, supported by PostgreSQL and SQLite.
+    """
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        batch = rows[start : start + UPSERT_BATCH_SIZE]
+        stmt = dialect.insert(model).values(batch)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key],
+            set_={
+                column: stmt.excluded[column]
+                for column in batch[0]
+                if column not in (key, "id")
+            },
+        )
+        db.execute(stmt)
+
+
+# Statement builders shared by the sync functions below and app.async_crud.
+
+
+def books_statement(skip: int = 0, limit: int = 10) -> Select:
+    return select(models.Book).order_by(models.Book.id).offset(skip).limit(limit)
+
+
+# Sort orders for keyset pagination; each is backed by a (column, id) index.
+BOOK_SORT_KEYS = {
+    "id": models.Book.id,
+    "price": models.Book.price_incl_tax,
+    "rating": models.Book.rating,
+    "title": models.Book.title,
+}
+
+
+def encode_cursor(sort: str, descending: bool, book: models.Book) -> str:
+    """
+    Opaque pagination cursor pointing just after the given book.
+    """
+    value = getattr(book, BOOK_SORT_KEYS[sort].key)
+    payload = json.dumps([sort, descending, value, book.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[object, int]:
+    """
+    Decode a cursor into (sort value, id) of the last book seen.
+    Raises ValueError if it is malformed, was issued for another sort order
+    or holds a value of the wrong type for the sort key.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_desc, value, book_id = json.loads(
+            base64.urlsafe_b64decode(padded)
+        )
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if cursor_sort != sort or cursor_desc != descending:
+        raise ValueError("Cursor does not match the requested sort order")
+    if not _is_sort_value(book_id, int) or not _is_sort_value(
+        value, BOOK_SORT_KEYS[sort].type.python_type
+    ):
+        raise ValueError("Invalid cursor")
+    return value, book_id
+
+
+def _is_sort_value(value: object, python_type: type) -> bool:
+    # Whole prices may come back from JSON as ints; bool is an int subclass.
+    if isinstance(value, bool):
+        return False
+    if python_type is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, python_type)
+
+
+def books_page_statement(
+    sort: str = "id",
+    descending: bool = False,
+    cursor: str = None,
+    limit: int = 10,
+    skip: int = 0,
+) -> Select:
+    """
+    One page of books in (sort key, id) order. With a cursor, the page
+    starts right after it (keyset pagination, skip is ignored); otherwise
+    skip rows are skipped.
+    """
+    column = BOOK_SORT_KEYS[sort]
+    stmt = select(models.Book)
+    if cursor:
+        value, book_id = decode_cursor(cursor, sort, descending)
+        if sort == "id":
+            key, after = models.Book.id, book_id
+        else:
+            key, after = tuple_(column, models.Book.id), tuple_(value, book_id)
+        stmt = stmt.where(key < after if descending else key > after)
+    elif skip:
+        stmt = stmt.offset(skip)
+    if sort == "id":
+        order = [column.desc() if descending else column]
+    elif descending:
+        order = [column.desc(), models.Book.id.desc()]
+    else:
+        order = [column, models.Book.id]
+    return stmt.order_by(*order).limit(limit)
+
+
+def next_cursor(
+    books: List[models.Book], sort: str, descending: bool, limit: int
+) -> str:
+    """
+    Cursor for the page after books, or None if this was the last page.
+    """
+    if not books or len(books) < limit:
+        return None
+    return encode_cursor(sort, descending, books[-1])
+
+
+def book_by_id_statement(book_id: int) -> Select:
+    return select(models.Book).where(models.Book.id == book_id)
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def paginate(stmt: Select, skip: int = 0, limit: int = None) -> Select:
+    """
+    Order a books statement by id and apply skip/limit (no limit if None).
+    """
+    return stmt.order_by(models.Book.id).offset(skip or None).limit(limit)
+
+
+def search_books_statement(
+    title: str = None, category: str = None, skip: int = 0, limit: int = None
+) -> Select:
+    stmt = select(models.Book)
+    if title:
+        stmt = stmt.where(models.Book.title.ilike(f"%{title}%"))
+    if category:
+        stmt = stmt.where(models.Book.category.ilike(f"%{category}%"))
+    return paginate(stmt, skip, limit)
+
+
+def price_range_statement(
+    min: float = None, max: float = None, skip: int = 0, limit: int = None
+) -> Select:
+    stmt = select(models.Book)
+    if min:
+        stmt = stmt.where(models.Book.price_incl_tax >= min)
+    if max:
+        stmt = stmt.where(models.Book.price_incl_tax <= max)
+    return paginate(stmt, skip, limit)
+
+
+def categories_statement() -> Select:
+    return select(models.CategoryStats.category).order_by(models.CategoryStats.category)
+
+
+def catalog_stats_statement() -> Select:
+    return select(models.CatalogStats).where(models.CatalogStats.id == 1)
+
+
+def category_stats_statement() -> Select:
+    return select(
+        models.CategoryStats.category,
+        models.CategoryStats.total_books,
+        models.CategoryStats.average_price,
+        models.CategoryStats.median_price,
+        models.CategoryStats.p90_price,
+        models.CategoryStats.total_stock,
+    ).order_by(models.CategoryStats.category)
+
+
+def dataset_version_statement() -> Select:
+    return select(models.DatasetVersion.version).where(models.DatasetVersion.id == 1)
+
+
+def top_rated_statement(skip: int = 0, limit: int = None) -> Select:
+    return paginate(select(models.Book).where(models.Book.rating == 5), skip, limit)
+
+
+def build_stats_overview(stats: models.CatalogStats) -> schemas.BookStatsOverview:
+    """
+    Build the stats overview from the materialized catalog stats row
+    (see app.aggregates); an empty overview if it doesn't exist yet.
+    """
+    if stats is None:
+        return schemas.BookStatsOverview(
+            total_books=0, average_price=0.0, rating_distribution={}
+        )
+    return schemas.BookStatsOverview(
+        total_books=stats.total_books,
+        average_price=stats.average_price,
+        rating_distribution=stats.rating_distribution,
+        min_price=stats.min_price,
+        max_price=stats.max_price,
+        median_price=stats.median_price,
+        p90_price=stats.p90_price,
+        total_stock=stats.total_stock,
+    )
+
+
+def build_category_stats(results) -> List[dict]:
+    """
+    Build per-category stats from (category, count, avg price, median price,
+    p90 price, stock) rows.
+    """
+    return [
+        {
+            "category": category,
+            "total_books": total,
+            "average_price": float(avg_price) if avg_price else 0.0,
+            "median_price": median_price,
+            "p90_price": p90_price,
+            "total_stock": total_stock,
+        }
+        for category, total, avg_price, median_price, p90_price, total_stock in results
+    ]
 
 
 def get_books(db: Session, skip: int = 0, limit: int = 10) -> List[models.Book]:
     """
     Retrieve a paginated list of books from the database.
     """
-    return db.query(models.Book).offset(skip).limit(limit).all()
+    return db.scalars(books_statement(skip, limit)).all()
 
 
-def create_books(db: Session, books: List[schemas.BookBase]) -> int:
+def get_books_page(
+    db: Session,
+    sort: str = "id",
+    descending: bool = False,
+    cursor: str = None,
+    limit: int = 10,
+    skip: int = 0,
+) -> Tuple[List[models.Book], str]:
     """
-    Delete all existing books and insert new ones.
+    Retrieve a page of books and the cursor of the next page (None at the end).
     """
-    db.query(models.Book).delete()
-    for book in books:
-        db_book = models.Book(**book.dict())
-        db.add(db_book)
+    books = db.scalars(
+        books_page_statement(sort, descending, cursor, limit, skip)
+    ).all()
+    return books, next_cursor(books, sort, descending, limit)
+
+
+def upsert_books(db: Session, books: List[schemas.BookBase]) -> int:
+    """
+    Insert new books and update existing ones, matched by UPC.
+    """
+    if books:
+        _upsert(db, models.Book, [book.dict(exclude={"id"}) for book in books], "upc")
+        bump_dataset_version(db)
+        refresh_aggregates(db)
     db.commit()
     return len(books)
 
@@ -32,38 +286,43 @@ def get_book_by_id(db: Session, book_id: int):
     """
     Retrieve a book by its ID.
     """
-    return db.query(models.Book).filter(models.Book.id == book_id).first()
+    return db.scalars(book_by_id_statement(book_id)).first()
 
 
-def search_books(db: Session, title: str = None, category: str = None):
+def search_books(
+    db: Session,
+    title: str = None,
+    category: str = None,
+    skip: int = 0,
+    limit: int = None,
+):
     """
     Search books by title and/or category.
     """
-    query = db.query(models.Book)
-    if title:
-        query = query.filter(models.Book.title.ilike(f"%{title}%"))
-    if category:
-        query = query.filter(models.Book.category.ilike(f"%{category}%"))
-    return query.all()
+    return db.scalars(search_books_statement(title, category, skip, limit)).all()
 
 
-def search_books_by_price(db: Session, min: float = None, max: float = None):
+def search_books_by_price(
+    db: Session, min: float = None, max: float = None, skip: int = 0, limit: int = None
+):
     """
     Search books by price range.
     """
-    query = db.query(models.Book)
-    if min:
-        query = query.filter(models.Book.price_incl_tax >= min)
-    if max:
-        query = query.filter(models.Book.price_incl_tax <= max)
-    return query.all()
+    return db.scalars(price_range_statement(min, max, skip, limit)).all()
+
+
+def get_dataset_version(db: Session) -> int:
+    """
+    Current dataset version of the catalog (0 before the first ingest).
+    """
+    return db.scalar(dataset_version_statement()) or 0
 
 
 def get_categories(db: Session):
     """
     Get a list of all distinct book categories.
     """
-    return [row[0] for row in db.query(models.Book.category).distinct().all()]
+    return db.scalars(categories_statement()).all()
 
 
 def get_stats_overview(db: Session):
@@ -71,52 +330,21 @@ def get_stats_overview(db: Session):
     Get overview statistics for books: total, average price,
     rating distribution.
     """
-    total_books = db.query(models.Book).count()
-    average_price = db.query(func.avg(models.Book.price_incl_tax)).scalar() or 0.0
-
-    rating_distribution = dict(
-        db.query(models.Book.rating, func.count(models.Book.id))
-        .group_by(models.Book.rating)
-        .all()
-    )
-
-    return schemas.BookStatsOverview(
-        total_books=total_books,
-        average_price=float(average_price),
-        rating_distribution=rating_distribution,
-    )
+    return build_stats_overview(db.scalars(catalog_stats_statement()).first())
 
 
 def get_category_overview(db: Session):
     """
     Get statistics for each book category.
     """
-    results = (
-        db.query(
-            models.Book.category,
-            func.count(models.Book.id),
-            func.avg(models.Book.price_incl_tax),
-        )
-        .group_by(models.Book.category)
-        .all()
-    )
+    return build_category_stats(db.execute(category_stats_statement()).all())
 
-    category_stats = [
-        {
-            "category": category,
-            "total_books": total,
-            "average_price": float(avg_price) if avg_price else 0.0,
-        }
-        for category, total, avg_price in results
-    ]
-    return category_stats
 
-
-def get_top_rated(db: Session):
+def get_top_rated(db: Session, skip: int = 0, limit: int = None):
     """
-    Get all books with the highest rating (5).
+    Get books with the highest rating (5).
     """
-    return db.query(models.Book).filter(models.Book.rating == 5).all()
+    return db.scalars(top_rated_statement(skip, limit)).all()
 
 
 def create_request_log(
@@ -136,9 +364,389 @@ def create_request_log(
     db.refresh(log)
     return log
 
-def truncate_books(db: Session):
+
+def create_request_logs(db: Session, entries: List[dict]) -> int:
+    """
+    Bulk-insert request log entries (dicts of RequestLog columns).
+    """
+    if entries:
+        db.execute(insert(models.RequestLog), entries)
+    db.commit()
+    return len(entries)
+
+
+def get_scrape_state(db: Session) -> Dict[str, dict]:
+    """
+    Get the stored page state used by incremental scraping, keyed by URL.
+    """
+    return {
+        page.url: {
+            "etag": page.etag,
+            "last_modified": page.last_modified,
+            "content_hash": page.content_hash,
+        }
+        for page in db.query(models.ScrapePage).all()
+    }
+
+
+def save_scrape_state(db: Session, state: Dict[str, dict]):
+    """
+    Insert or update page state entries.
+    """
+    now = datetime.utcnow()
+    rows = [{"url": url, **entry, "updated_ts": now} for url, entry in state.items()]
+    if rows:
+        _upsert(db, models.ScrapePage, rows, "url")
+    db.commit()
+
+
+ACTIVE_JOB_STATUSES = ("queued", "running")
+SCRAPE_PARTITION_PAGES = int(os.environ.get("SCRAPE_PARTITION_PAGES", 5))
+SCRAPE_LEASE_MAX_ATTEMPTS = int(os.environ.get("SCRAPE_LEASE_MAX_ATTEMPTS", 3))
+# An active job without a heartbeat for this long has no live worker.
+SCRAPE_JOB_STALE_S = float(os.environ.get("SCRAPE_JOB_STALE_S", 900))
+
+
+def job_ingest(db: Session, job_id: int, partition: str = None) -> SnapshotIngest:
+    """
+    Ingest writer for the staging table shared by all workers of a full job.
+    """
+    return SnapshotIngest(db, f"tb_books_staging_{job_id}", partition=partition)
+
+
+def create_scrape_job(
+    db: Session,
+    pages: int,
+    mode: str = "full",
+    partition_pages: int = SCRAPE_PARTITION_PAGES,
+) -> Tuple[models.ScrapeJob, bool]:
+    """
+    Queue a scraping job, split into page-range leases, unless one is
+    already queued or running. Returns the job and whether it was created.
+    """
+    expire_stale_scrape_jobs(db)
+    job = models.ScrapeJob(pages=pages, mode=mode, active_key="active")
+    db.add(job)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        active = (
+            db.query(models.ScrapeJob)
+            .filter(models.ScrapeJob.active_key == "active")
+            .first()
+        )
+        if active is None:
+            raise
+        return active, False
+    step = max(1, partition_pages)
+    for page_start in range(1, pages + 1, step):
+        db.add(
+            models.ScrapeLease(
+                job_id=job.id,
+                page_start=page_start,
+                page_count=min(step, pages + 1 - page_start),
+            )
+        )
+    db.commit()
+    db.refresh(job)
+    return job, True
+
+
+def expire_stale_scrape_jobs(db: Session, stale_s: float = SCRAPE_JOB_STALE_S) -> int:
+    """
+    Fail active jobs that no worker has touched for stale_s seconds (e.g.
+    every worker died), releasing the active slot for a new job.
+    Returns the number of jobs expired.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_s)
+    stale_ids = db.scalars(
+        select(models.ScrapeJob.id).where(
+            models.ScrapeJob.status.in_(ACTIVE_JOB_STATUSES),
+            func.coalesce(models.ScrapeJob.heartbeat_ts, models.ScrapeJob.created_ts)
+            < cutoff,
+        )
+    ).all()
+    for job_id in stale_ids:
+        finish_scrape_job(
+            db, job_id, "failed", f"No worker heartbeat for {stale_s:.0f}s"
+        )
+    return len(stale_ids)
+
+
+def get_scrape_job(db: Session, job_id: int):
+    """
+    Retrieve a scraping job by its ID.
+    """
+    return db.query(models.ScrapeJob).filter(models.ScrapeJob.id == job_id).first()
+
+
+def cancel_scrape_job(db: Session, job_id: int):
+    """
+    Cancel a queued job, or ask the workers to stop a running one.
+    """
+    job = get_scrape_job(db, job_id)
+    if job is None or job.status not in ACTIVE_JOB_STATUSES:
+        return job
+    if job.status == "queued":
+        finish_scrape_job(db, job.id, "cancelled")
+    else:
+        job.cancel_requested = True
+        db.commit()
+    db.refresh(job)
+    return job
+
+
+def _start_scrape_job(db: Session, job: models.ScrapeJob):
+    """
+    Move a queued job to running and create its staging table in the same
+    transaction, so other workers never see a running job without one.
+    """
+    now = datetime.utcnow()
+    started = db.execute(
+        update(models.ScrapeJob)
+        .where(models.ScrapeJob.id == job.id, models.ScrapeJob.status == "queued")
+        .values(status="running", started_ts=now, heartbeat_ts=now)
+    ).rowcount
+    if started and job.mode == "full":
+        job_ingest(db, job.id).create()
+    db.commit()
+
+
+def claim_scrape_lease(db: Session, worker_id: str, ttl_s: float):
     """
-    Truncate the books table.
+    Lease the next pending (or expired) page range of an active job.
+    Returns the lease, or None when there is nothing to do.
     """
-    db.query(models.Book).delete()
-    db.commit()
\ No newline at end of file
+    now = datetime.utcnow()
+    claimable = or_(
+        models.ScrapeLease.status == "pending",
+        and_(
+            models.ScrapeLease.status == "leased",
+            models.ScrapeLease.lease_expires_ts < now,
+        ),
+    )
+    candidates = (
+        db.query(models.ScrapeLease, models.ScrapeJob)
+        .join(models.ScrapeJob, models.ScrapeJob.id == models.ScrapeLease.job_id)
+        .filter(
+            claimable,
+            models.ScrapeJob.status.in_(ACTIVE_JOB_STATUSES),
+        )
+        .order_by(models.ScrapeLease.id)
+        .limit(10)
+        .all()
+    )
+    for lease, job in candidates:
+        if job.cancel_requested:
+            finish_scrape_job(db, job.id, "cancelled")
+            continue
+        if job.status == "queued":
+            _start_scrape_job(db, job)
+        token = uuid.uuid4().hex
+        claimed = db.execute(
+            update(models.ScrapeLease)
+            .where(models.ScrapeLease.id == lease.id, claimable)
+            .values(
+                status="leased",
+                worker_id=worker_id,
+                claim_token=token,
+                lease_expires_ts=now + timedelta(seconds=ttl_s),
+                attempts=models.ScrapeLease.attempts + 1,
+            )
+        ).rowcount
+        db.commit()
+        if claimed:
+            db.refresh(lease)
+            return lease
+    return None
+
+
+def renew_scrape_lease(db: Session, lease: models.ScrapeLease, ttl_s: float) -> bool:
+    """
+    Extend a lease and refresh the job heartbeat. Returns False if the
+    lease was lost or the job was cancelled, in which case the worker
+    should stop.
+    """
+    now = datetime.utcnow()
+    renewed = db.execute(
+        update(models.ScrapeLease)
+        .where(
+            models.ScrapeLease.id == lease.id,
+            models.ScrapeLease.claim_token == lease.claim_token,
+            models.ScrapeLease.status == "leased",
+        )
+        .values(lease_expires_ts=now + timedelta(seconds=ttl_s))
+    ).rowcount
+    db.execute(
+        update(models.ScrapeJob)
+        .where(models.ScrapeJob.id == lease.job_id)
+        .values(heartbeat_ts=now)
+    )
+    db.commit()
+    job = get_scrape_job(db, lease.job_id)
+    return bool(renewed) and job.status == "running" and not job.cancel_requested
+
+
+def complete_scrape_lease(
+    db: Session, lease: models.ScrapeLease, books_written: int
+) -> bool:
+    """
+    Mark a lease done and add its totals to the job.
+    Returns False if the lease had already been reclaimed by another worker.
+    """
+    done = db.execute(
+        update(models.ScrapeLease)
+        .where(
+            models.ScrapeLease.id == lease.id,
+            models.ScrapeLease.claim_token == lease.claim_token,
+            models.ScrapeLease.status == "leased",
+        )
+        .values(status="done", books_written=books_written)
+    ).rowcount
+    if done:
+        db.execute(
+            update(models.ScrapeJob)
+            .where(models.ScrapeJob.id == lease.job_id)
+            .values(
+                pages_done=models.ScrapeJob.pages_done + lease.page_count,
+                books_written=models.ScrapeJob.books_written + books_written,
+                heartbeat_ts=datetime.utcnow(),
+            )
+        )
+    db.commit()
+    return bool(done)
+
+
+def release_scrape_lease(db: Session, lease: models.ScrapeLease, error: str):
+    """
+    Give a failed lease back to the pool, or fail the job once the lease
+    has used up its attempts.
+    """
+    if lease.attempts >= SCRAPE_LEASE_MAX_ATTEMPTS:
+        finish_scrape_job(db, lease.job_id, "failed", error)
+        return
+    db.execute(
+        update(models.ScrapeLease)
+        .where(
+            models.ScrapeLease.id == lease.id,
+            models.ScrapeLease.claim_token == lease.claim_token,
+        )
+        .values(status="pending", worker_id=None, lease_expires_ts=None)
+    )
+    db.commit()
+
+
+def return_scrape_lease(db: Session, lease: models.ScrapeLease):
+    """
+    Hand a lease back to the pool right away when its worker shuts down,
+    without counting the interrupted attempt.
+    """
+    db.execute(
+        update(models.ScrapeLease)
+        .where(
+            models.ScrapeLease.id == lease.id,
+            models.ScrapeLease.claim_token == lease.claim_token,
+            models.ScrapeLease.status == "leased",
+        )
+        .values(
+            status="pending",
+            worker_id=None,
+            lease_expires_ts=None,
+            attempts=models.ScrapeLease.attempts - 1,
+        )
+    )
+    db.commit()
+
+
+def finalize_scrape_job(db: Session, job_id: int) -> bool:
+    """
+    Complete a job once all of its leases are done. For full jobs, the
+    staged rows of the completed leases replace tb_books in the same
+    transaction, and the ingest's row count and throughput are logged.
+    Only one worker wins; returns True for that worker.
+    """
+    remaining = db.scalar(
+        select(func.count(models.ScrapeLease.id)).where(
+            models.ScrapeLease.job_id == job_id, models.ScrapeLease.status != "done"
+        )
+    )
+    if remaining:
+        return False
+    job = get_scrape_job(db, job_id)
+    now = datetime.utcnow()
+    won = db.execute(
+        update(models.ScrapeJob)
+        .where(models.ScrapeJob.id == job_id, models.ScrapeJob.status == "running")
+        .values(
+            status="succeeded",
+            active_key=None,
+            finished_ts=now,
+            duration_s=(now - (job.started_ts or job.created_ts)).total_seconds(),
+        )
+    ).rowcount
+    if not won:
+        db.rollback()
+        return False
+    if job.mode == "full":
+        ingest = job_ingest(db, job_id)
+        done_tokens = select(models.ScrapeLease.claim_token).where(
+            models.ScrapeLease.job_id == job_id, models.ScrapeLease.status == "done"
+        )
+        started = time.perf_counter()
+        try:
+            rows = ingest.swap(ingest.staging.c.partition_key.in_(done_tokens))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        duration = time.perf_counter() - started
+        result = schemas.IngestResult(
+            rows=rows,
+            duration_s=duration,
+            rows_per_sec=rows / duration if duration > 0 else 0.0,
+        )
+        logger.info(
+            "Job %s ingested %d rows in %.2fs (%.0f rows/s)",
+            job_id,
+            result.rows,
+            result.duration_s,
+            result.rows_per_sec,
+        )
+        ingest.discard()
+    else:
+        db.commit()
+    return True
+
+
+def finish_scrape_job(db: Session, job_id: int, status: str, error: str = None) -> bool:
+    """
+    Mark an active job as failed or cancelled, release the active slot and
+    drop its staging table. A job that already finished (e.g. one that
+    finalize_scrape_job just completed) is left alone; returns True only
+    if this call finished the job.
+    """
+    job = get_scrape_job(db, job_id)
+    if job is None:
+        return False
+    now = datetime.utcnow()
+    finished = db.execute(
+        update(models.ScrapeJob)
+        .where(
+            models.ScrapeJob.id == job_id,
+            models.ScrapeJob.status.in_(ACTIVE_JOB_STATUSES),
+        )
+        .values(
+            status=status,
+            error=error,
+            active_key=None,
+            finished_ts=now,
+            duration_s=(now - (job.started_ts or job.created_ts)).total_seconds(),
+        )
+    ).rowcount
+    db.commit()
+    if finished != 1:
+        return False
+    if job.mode == "full":
+        job_ingest(db, job_id).discard()
+    return True
@@ -1,14 +1,22 @@
 
 """
 Database configuration for SQLAlchemy and PostgreSQL (Supabase).
-Uses environment variables for connection string components.
+Uses environment variables for connection string components; DATABASE_URL,
+when set, overrides them (e.g. sqlite:///books.db for local runs).
 Defines engine, session, and base class for cloud database usage.
+API reads go through an async engine (asyncpg / aiosqlite) derived from the
+same URL; ASYNC_DATABASE_URL overrides it. Scraping jobs and the worker keep
+using the sync engine. Pool settings are read from the environment (see
+app.db_pool).
 """
 
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from app.db_pool import instrument, pool_options
 
 load_dotenv()
 
@@ -19,10 +27,75 @@ DB_PORT = os.environ.get("DB_PORT")
 DB_NAME = os.environ.get("DB_NAME")
 DB_SSLMODE = os.environ.get("DB_SSLMODE")
 
-SQLALCHEMY_DATABASE_URL = (
+SQLALCHEMY_DATABASE_URL = os.environ.get("DATABASE_URL") or (
     f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?sslmode={DB_SSLMODE}"
 )
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+def async_url(url: str) -> str:
+    """
+    Map a sync database URL to its async driver: psycopg2 -> asyncpg
+    (sslmode becomes ssl) and sqlite -> aiosqlite.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "postgresql":
+        query = dict(parsed.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+    elif parsed.get_backend_name() == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL") or async_url(
+    SQLALCHEMY_DATABASE_URL
+)
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **pool_options(SQLALCHEMY_DATABASE_URL))
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL, is_async=True)
+)
+instrument(engine)
+instrument(async_engine.sync_engine)
+
+if engine.dialect.name == "sqlite":
+
+    @event.listens_for(engine, "connect")
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _sqlite_wal(dbapi_connection, connection_record):
+        """
+        Use WAL so readers don't block writers when several worker
+        processes share a local SQLite database.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=30000")
+        cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 Base = declarative_base()
+
+
+async def get_db():
+    """
+    Dependency to get an async SQLAlchemy session.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_sync_db():
+    """
+    Dependency to get a sync SQLAlchemy session, for routes sharing crud
+    functions with the scraping worker.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,168 @@
+"""
+Connection pool configuration and instrumentation.
+Pool settings come from environment variables:
+    DB_POOL_SIZE (default 5), DB_MAX_OVERFLOW (default 10),
+    DB_POOL_TIMEOUT seconds to wait for a connection (default 30),
+    DB_POOL_RECYCLE seconds before a connection is replaced (default 1800),
+    DB_POOL_PRE_PING (default true),
+    DB_STATEMENT_TIMEOUT_MS, PostgreSQL statement_timeout (default 0 = off).
+The instrumented pools record how long checkouts wait for a connection,
+timeouts and invalidations; pool_stats() reports them for /api/v1/health.
+"""
+
+import os
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 0))
+
+
+class PoolMetrics:
+    """
+    Thread-safe checkout counters shared by a pool and its recreations.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_s_total = 0.0
+        self.wait_s_max = 0.0
+        self.timeouts = 0
+        self.invalidations = 0
+
+    def record_checkout(self, wait_s: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_s_total += wait_s
+            self.wait_s_max = max(self.wait_s_max, wait_s)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times every checkout, including waits for a free
+    connection, new connections and pre-pings.
+    """
+
+    metrics: PoolMetrics = None
+
+    def connect(self):
+        if self.metrics is None:
+            self.metrics = PoolMetrics()
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool; keep counting.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """
+    Instrumented pool for async engines.
+    """
+
+
+def pool_options(url: str, is_async: bool = False) -> dict:
+    """
+    create_engine() keyword arguments for the configured pool.
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool.
+    """
+    parsed = make_url(url)
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if parsed.get_backend_name() == "postgresql" and DB_STATEMENT_TIMEOUT_MS > 0:
+        if is_async:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+            }
+        else:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+            }
+    return options
+
+
+def instrument(engine: Engine):
+    """
+    Count connection invalidations (errors, failed pre-pings) on an engine.
+    """
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return
+    if pool.metrics is None:
+        pool.metrics = PoolMetrics()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        engine.pool.metrics.record_invalidation()
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+        engine.pool.metrics.record_invalidation()
+
+
+def pool_stats(engine: Engine) -> dict:
+    """
+    Current pool state and checkout counters of an engine.
+    """
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"pool": type(pool).__name__, "status": pool.status()}
+    metrics = pool.metrics or PoolMetrics()
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "max_overflow": pool._max_overflow,
+        "checkouts": metrics.checkouts,
+        "wait_ms_avg": (
+            metrics.wait_s_total / metrics.checkouts * 1000
+            if metrics.checkouts
+            else 0.0
+        ),
+        "wait_ms_max": metrics.wait_s_max * 1000,
+        "timeouts": metrics.timeouts,
+        "invalidations": metrics.invalidations,
+    }
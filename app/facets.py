@@ -0,0 +1,258 @@
+"""
+Faceted catalog queries over bitmap indexes.
+Every book gets a bit position in (price, id) order, and each filter value
+(category, rating, price bucket, availability) has a precomputed bitmap
+(a Python int). A query ANDs the bitmaps of the selected filters; a price
+range is a contiguous run of bits. Facet counts are disjunctive: each
+facet is counted with all other filters applied, via int.bit_count().
+The index is rebuilt when the dataset version changes, from the catalog
+snapshot when it is loaded, otherwise from the database; one request
+rebuilds it, in a worker thread, while concurrent ones wait for it.
+"""
+
+import asyncio
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, models, schemas
+from app.search import ranked_statement
+from app.snapshot import catalog_snapshot
+
+# Upper bounds of the price facet buckets; the last bucket is open-ended.
+PRICE_BUCKETS = [10.0, 20.0, 30.0, 40.0, 50.0]
+
+
+def _bitmap(positions, size: int) -> int:
+    # Set bits in a byte buffer first: OR-ing into an int copies it each time.
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def _run(start: int, end: int) -> int:
+    # Bits start..end-1 set
+    return ((1 << end) - 1) ^ ((1 << start) - 1)
+
+
+def bucket_label(index: int) -> str:
+    low = PRICE_BUCKETS[index - 1] if index else 0.0
+    if index == len(PRICE_BUCKETS):
+        return f"{low:g}+"
+    return f"{low:g}-{PRICE_BUCKETS[index]:g}"
+
+
+class FacetIndex:
+    """
+    Bitmaps of one catalog version.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[int],
+        categories: Sequence[str],
+        ratings: Sequence[int],
+        prices: Sequence[float],
+        available: Sequence[int],
+        version=None,
+    ):
+        self.version = version
+        order = sorted(range(len(ids)), key=lambda row: (prices[row], ids[row]))
+        self.ids = [ids[row] for row in order]
+        self.prices = [prices[row] for row in order]
+        self.size = len(order)
+        self.all = _run(0, self.size)
+        by_category: Dict[str, List[int]] = {}
+        by_rating: Dict[int, List[int]] = {}
+        in_stock = []
+        for position, row in enumerate(order):
+            by_category.setdefault(categories[row], []).append(position)
+            by_rating.setdefault(ratings[row], []).append(position)
+            if available[row] > 0:
+                in_stock.append(position)
+        self.category = {
+            name: _bitmap(positions, self.size)
+            for name, positions in sorted(by_category.items())
+        }
+        self.rating = {
+            rating: _bitmap(positions, self.size)
+            for rating, positions in sorted(by_rating.items())
+        }
+        self.available = _bitmap(in_stock, self.size)
+        self.price_bucket = {}
+        start = 0
+        for index in range(len(PRICE_BUCKETS) + 1):
+            end = (
+                bisect_left(self.prices, PRICE_BUCKETS[index])
+                if index < len(PRICE_BUCKETS)
+                else self.size
+            )
+            self.price_bucket[bucket_label(index)] = _run(start, end)
+            start = end
+
+    def price_mask(self, min_price: float = None, max_price: float = None) -> int:
+        start = bisect_left(self.prices, min_price) if min_price is not None else 0
+        end = (
+            bisect_right(self.prices, max_price) if max_price is not None else self.size
+        )
+        return _run(start, end) if start < end else 0
+
+    def query(
+        self,
+        categories: List[str] = None,
+        ratings: List[int] = None,
+        min_price: float = None,
+        max_price: float = None,
+        available: Optional[bool] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ):
+        """
+        Returns (total, ids of the requested page, facet counts).
+        """
+        masks = {
+            "category": (
+                _or(self.category.get(name, 0) for name in categories)
+                if categories
+                else self.all
+            ),
+            "rating": (
+                _or(self.rating.get(rating, 0) for rating in ratings)
+                if ratings
+                else self.all
+            ),
+            "price": self.price_mask(min_price, max_price),
+            "available": (
+                self.all
+                if available is None
+                else self.available if available else self.all & ~self.available
+            ),
+        }
+
+        def others(facet: str) -> int:
+            mask = self.all
+            for name, value in masks.items():
+                if name != facet:
+                    mask &= value
+            return mask
+
+        matches = others(None)
+        facets = {
+            "category": _counts(self.category, others("category")),
+            "rating": _counts(self.rating, others("rating")),
+            "price": _counts(self.price_bucket, others("price")),
+            "available": {
+                "true": (others("available") & self.available).bit_count(),
+                "false": (others("available") & ~self.available).bit_count(),
+            },
+        }
+        return matches.bit_count(), self._page(matches, skip, limit), facets
+
+    def _page(self, bitmap: int, skip: int, limit: int) -> List[int]:
+        # Walk 64-bit words, skipping whole words by their popcount.
+        words = array("Q", bitmap.to_bytes((self.size + 63) // 64 * 8, "little"))
+        if sys.byteorder != "little":
+            words.byteswap()
+        ids = []
+        for word_index, word in enumerate(words):
+            if not word:
+                continue
+            count = word.bit_count()
+            if skip >= count:
+                skip -= count
+                continue
+            while word:
+                low = word & -word
+                word ^= low
+                if skip:
+                    skip -= 1
+                    continue
+                ids.append(self.ids[word_index * 64 + low.bit_length() - 1])
+                if len(ids) >= limit:
+                    return ids
+        return ids
+
+
+def _or(bitmaps) -> int:
+    result = 0
+    for bitmap in bitmaps:
+        result |= bitmap
+    return result
+
+
+def _counts(bitmaps: Dict, mask: int) -> Dict:
+    return {key: (bitmap & mask).bit_count() for key, bitmap in bitmaps.items()}
+
+
+_index = FacetIndex([], [], [], [], [])
+_index_lock = asyncio.Lock()
+
+
+async def facet_index(db: AsyncSession) -> FacetIndex:
+    """
+    The facet index of the current dataset version, rebuilt if it moved on.
+    Concurrent requests wait for a single rebuild, which builds the bitmaps
+    in a worker thread so the event loop keeps serving other requests.
+    """
+    global _index
+    snapshot = catalog_snapshot.current()
+    version = (
+        snapshot.version
+        if snapshot is not None
+        else await async_crud.get_dataset_version(db)
+    )
+    if _index.version == version:
+        return _index
+    async with _index_lock:
+        if _index.version != version:
+            if snapshot is not None:
+                columns = (
+                    snapshot.ids,
+                    [snapshot.category_names[code] for code in snapshot.category],
+                    snapshot.rating,
+                    snapshot.price_incl_tax,
+                    snapshot.num_available,
+                )
+            else:
+                rows = (
+                    await db.execute(
+                        select(
+                            models.Book.id,
+                            models.Book.category,
+                            models.Book.rating,
+                            models.Book.price_incl_tax,
+                            models.Book.num_available,
+                        )
+                    )
+                ).all()
+                columns = list(zip(*rows)) or [()] * 5
+            _index = await asyncio.to_thread(FacetIndex, *columns, version=version)
+    return _index
+
+
+async def query_books(
+    db: AsyncSession,
+    categories: List[str] = None,
+    ratings: List[int] = None,
+    min_price: float = None,
+    max_price: float = None,
+    available: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> schemas.BookQueryResult:
+    """
+    Books matching every given filter, ordered by price, with facet counts.
+    """
+    index = await facet_index(db)
+    total, ids, facets = index.query(
+        categories, ratings, min_price, max_price, available, skip, limit
+    )
+    snapshot = catalog_snapshot.current()
+    if snapshot is not None and snapshot.version == index.version:
+        books = [snapshot.get(book_id) for book_id in ids]
+    else:
+        books = (await db.scalars(ranked_statement(ids))).all()
+    return schemas.BookQueryResult(total=total, books=books, facets=facets)
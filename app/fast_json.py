@@ -0,0 +1,71 @@
+"""
+Fast JSON path for book list endpoints.
+Books are selected as plain row tuples (no ORM entities) and encoded with
+orjson straight from dicts, skipping per-row Pydantic validation: the
+columns are exactly BookBase's fields and come from our own database.
+orjson is an optional dependency (`fast` extra); without it the stdlib
+encoder is used with the same output.
+"""
+
+import json
+from typing import Any, Iterable, List
+from fastapi import Response
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+BOOK_FIELDS = tuple(schemas.BookBase.model_fields)
+BOOK_COLUMNS = [models.Book.__table__.c[field] for field in BOOK_FIELDS]
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Compact JSON encoding of plain data.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def book_rows_statement(stmt: Select) -> Select:
+    """
+    The same query as a select(models.Book) statement, returning BookBase
+    columns as tuples.
+    """
+    return stmt.with_only_columns(*BOOK_COLUMNS)
+
+
+def book_dicts(rows: Iterable[tuple]) -> List[dict]:
+    return [dict(zip(BOOK_FIELDS, row)) for row in rows]
+
+
+async def fetch_books(db: AsyncSession, stmt: Select) -> List[dict]:
+    """
+    Books selected by a select(models.Book) statement, as dicts.
+    """
+    return book_dicts(await db.execute(book_rows_statement(stmt)))
+
+
+class JSONBytesResponse(Response):
+    """
+    JSON response rendered with the fast encoder.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def books_response(books: List[dict], response: Response = None) -> Response:
+    """
+    JSON response of book dicts, keeping headers set on the endpoint's
+    injected response (e.g. ETag by app.http_cache.conditional_get).
+    """
+    headers = dict(response.headers) if response is not None else None
+    return JSONBytesResponse(books, headers=headers)
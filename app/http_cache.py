@@ -0,0 +1,134 @@
+"""
+HTTP conditional requests for catalog endpoints.
+Responses carry a strong ETag derived from the dataset version, the path
+and the (sorted) query parameters, plus Cache-Control max-age
+HTTP_CACHE_MAX_AGE_S (default 60). A request whose If-None-Match matches
+gets a bodyless 304 before the endpoint runs.
+The version is read from the database serving the request (a replica or
+the primary) at most every HTTP_CACHE_VERSION_TTL_S seconds (default 1)
+per database; in between, a 304 is answered without opening a session or
+connection, and validators may lag an ingest by that interval. When the catalog snapshot is loaded, the older of
+its version and the database's is used, so an ETag is never newer than the
+data of the body it is sent with.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from typing import Dict, Optional, Tuple
+from fastapi import Depends, HTTPException, Request, Response
+from app import async_crud
+from app.compression import identity_etag
+from app.replicas import EngineHealth, get_read_engine, read_router
+from app.snapshot import catalog_snapshot
+
+HTTP_CACHE_MAX_AGE_S = int(os.environ.get("HTTP_CACHE_MAX_AGE_S", 60))
+HTTP_CACHE_VERSION_TTL_S = float(os.environ.get("HTTP_CACHE_VERSION_TTL_S", 1))
+
+
+class DatasetVersionTracker:
+    """
+    Dataset version of each database, re-read at most every ttl_s.
+    """
+
+    def __init__(self, ttl_s: float = HTTP_CACHE_VERSION_TTL_S):
+        self.ttl_s = ttl_s
+        # Engine name -> (version, expiry time).
+        self.versions: Dict[str, Tuple[int, float]] = {}
+        self.lookups = 0
+        self.not_modified = 0
+        self.validated = 0
+        self._lock = asyncio.Lock()
+
+    async def current(self, health: EngineHealth) -> int:
+        """
+        Dataset version of the data the engine (and the snapshot, when
+        loaded) serves. Opens a session only to refresh an expired version.
+        """
+        version, expires = self.versions.get(health.name, (None, 0.0))
+        if time.monotonic() >= expires:
+            async with self._lock:
+                # Another request may have refreshed it while we waited.
+                version, expires = self.versions.get(health.name, (None, 0.0))
+                if time.monotonic() >= expires:
+                    version = await self._read(health)
+                    self.lookups += 1
+        snapshot = catalog_snapshot.current()
+        if snapshot is not None:
+            return min(snapshot.version, version)
+        return version
+
+    async def _read(self, health: EngineHealth) -> int:
+        # An unreachable replica is replaced by the primary, as in get_read_db.
+        health, db = await read_router.connect(health)
+        async with db:
+            version = await async_crud.get_dataset_version(db)
+        self.versions[health.name] = (version, time.monotonic() + self.ttl_s)
+        return version
+
+    def stats(self) -> dict:
+        """
+        Conditional request counters: validated requests, 304s and version
+        lookups.
+        """
+        return {
+            "versions": {name: version for name, (version, _) in self.versions.items()},
+            "max_age_s": HTTP_CACHE_MAX_AGE_S,
+            "validated": self.validated,
+            "not_modified": self.not_modified,
+            "version_lookups": self.lookups,
+        }
+
+
+dataset_version = DatasetVersionTracker()
+
+
+def make_etag(version: int, request: Request) -> str:
+    """
+    Strong ETag of a catalog response.
+    """
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{request.url.path}?{query}".encode()).hexdigest()[:16]
+    return f'"v{version}-{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> Optional[str]:
+    """
+    The If-None-Match tag matching etag (weak comparison, as RFC 9110
+    requires for it; compressed variants match too), or None.
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if identity_etag(tag) == etag:
+            return tag
+    return None
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    health: EngineHealth = Depends(get_read_engine),
+):
+    """
+    Router dependency: raise 304 if the client's copy is current, otherwise
+    add the ETag and Cache-Control headers to the response. Endpoints that
+    return a Response themselves (NDJSON streams) don't get the headers.
+    It shares the engine get_read_db picks for the endpoint, so the version
+    is that of the database the body is read from; being a route
+    dependency, it runs first and a 304 never opens the endpoint's session.
+    """
+    version = await dataset_version.current(health)
+    etag = make_etag(version, request)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={HTTP_CACHE_MAX_AGE_S}"}
+    dataset_version.validated += 1
+    matched = etag_matches(request.headers.get("if-none-match"), etag)
+    if matched:
+        dataset_version.not_modified += 1
+        # Echo the client's tag: it may be that of a compressed variant.
+        raise HTTPException(status_code=304, headers={**headers, "ETag": matched})
+    response.headers.update(headers)
@@ -0,0 +1,149 @@
+"""
+Bulk catalog ingest for tb_books.
+A new snapshot is bulk-loaded into a staging table (COPY on PostgreSQL,
+batched executemany elsewhere) and swapped into tb_books in a single
+transaction, so readers keep seeing the previous snapshot until commit.
+Several workers can share one staging table, each writing its own
+partition (see app.worker).
+"""
+
+import csv
+import io
+import uuid
+from typing import Iterable
+from datetime import datetime
+from sqlalchemy import Column, MetaData, String, Table, insert, select, update
+from sqlalchemy.orm import Session
+from . import models, schemas
+from .aggregates import refresh_aggregates
+
+INGEST_BATCH_SIZE = 1000
+
+BOOK_COLUMNS = [c.name for c in models.Book.__table__.columns if c.name != "id"]
+
+
+def bump_dataset_version(db: Session):
+    """
+    Increment the catalog's dataset version in the current transaction.
+    """
+    bumped = db.execute(
+        update(models.DatasetVersion)
+        .where(models.DatasetVersion.id == 1)
+        .values(version=models.DatasetVersion.version + 1, updated_ts=datetime.utcnow())
+    ).rowcount
+    if not bumped:
+        db.execute(
+            insert(models.DatasetVersion).values(
+                id=1, version=1, updated_ts=datetime.utcnow()
+            )
+        )
+
+
+def staging_table(name: str) -> Table:
+    """
+    Unconstrained copy of tb_books (without id) used as a load target.
+    The extra partition_key column tags rows with the writer that loaded them.
+    """
+    return Table(
+        name,
+        MetaData(),
+        *[
+            Column(c.name, c.type, nullable=c.nullable)
+            for c in models.Book.__table__.columns
+            if c.name != "id"
+        ],
+        Column("partition_key", String, nullable=True),
+    )
+
+
+class SnapshotIngest:
+    """
+    Staged, atomically swapped replacement of the whole books table.
+    Usage: create(), write() any number of batches, then swap() and commit
+    the session. Without a staging_name each ingest gets its own staging
+    table, so concurrent ingests don't overwrite each other's rows.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        staging_name: str = None,
+        partition: str = None,
+    ):
+        self.db = db
+        if staging_name is None:
+            staging_name = f"tb_books_staging_{uuid.uuid4().hex[:12]}"
+        self.staging = staging_table(staging_name)
+        self.partition = partition
+        self.rows = 0
+
+    def create(self):
+        """
+        Create the staging table in the current transaction (no commit).
+        """
+        self.staging.create(self.db.connection(), checkfirst=True)
+
+    def write(self, books: Iterable[schemas.BookBase]) -> int:
+        """
+        Bulk-load a batch of books into the staging table.
+        """
+        rows = [
+            {**book.dict(include=set(BOOK_COLUMNS)), "partition_key": self.partition}
+            for book in books
+        ]
+        if not rows:
+            return 0
+        if self.db.get_bind().dialect.name == "postgresql":
+            self._copy(rows)
+        else:
+            for start in range(0, len(rows), INGEST_BATCH_SIZE):
+                self.db.execute(
+                    insert(self.staging), rows[start : start + INGEST_BATCH_SIZE]
+                )
+        self.db.commit()
+        self.rows += len(rows)
+        return len(rows)
+
+    def _copy(self, rows):
+        """
+        Load rows with PostgreSQL COPY ... FROM STDIN (CSV).
+        """
+        columns = BOOK_COLUMNS + ["partition_key"]
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow([row[column] for column in columns])
+        buf.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {self.staging.name} ({', '.join(columns)}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buf,
+            )
+        finally:
+            cursor.close()
+
+    def swap(self, partition_filter=None) -> int:
+        """
+        Replace tb_books with the staged rows, optionally restricted by a
+        condition on the partition_key column, bump the dataset version and
+        refresh the materialized aggregates. Returns the number of rows.
+        Runs in the current transaction and leaves committing to the caller.
+        """
+        books = models.Book.__table__
+        staged = select(*[self.staging.c[column] for column in BOOK_COLUMNS])
+        if partition_filter is not None:
+            staged = staged.where(partition_filter)
+        self.db.execute(books.delete())
+        rows = self.db.execute(insert(books).from_select(BOOK_COLUMNS, staged)).rowcount
+        bump_dataset_version(self.db)
+        refresh_aggregates(self.db)
+        return rows
+
+    def discard(self):
+        """
+        Drop the staging table.
+        """
+        self.staging.drop(self.db.connection(), checkfirst=True)
+        self.db.commit()
@@ -4,11 +4,16 @@ Initializes FastAPI app, includes routers, and sets up logging middleware.
 """
 
 import time
+from contextlib import asynccontextmanager
+from datetime import datetime
 from fastapi import FastAPI, Request
 from starlette.responses import Response as StarletteResponse
-from app.database import engine, SessionLocal
-from app import models
-from app.crud import create_request_log
+from app.compression import CompressionMiddleware
+from app.database import engine
+from app.migrations import migrate
+from app.replicas import read_router
+from app.request_logging import request_log_buffer
+from app.snapshot import catalog_snapshot
 from app.routers.books import api_router
 from app.routers.auth import auth_router
 from app.routers.health import health_router
@@ -17,17 +22,38 @@ from app.routers.stats import stats_router
 from app.routers.ml import ml_router
 
 
-models.Base.metadata.create_all(bind=engine)
+migrate(engine)
 
 
-app = FastAPI(title="Books Scraper API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Run the request log flusher (and the catalog snapshot refresher, when
+    enabled) for the lifetime of the app; flush buffered entries on shutdown
+    and close the async engines' pooled connections, whose driver threads
+    (aiosqlite) would otherwise keep the process alive.
+    """
+    request_log_buffer.start()
+    catalog_snapshot.start()
+    yield
+    catalog_snapshot.stop()
+    request_log_buffer.stop()
+    await read_router.dispose()
+
+
+app = FastAPI(title="Books Scraper API", lifespan=lifespan)
+
+# Inside the logging middleware, which re-streams bodies in chunks that
+# would defeat the size threshold.
+app.add_middleware(CompressionMiddleware)
 
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """
     Middleware to log all HTTP requests and responses, including timing.
-    Persists log to database even on error.
+    Entries are buffered and persisted in batches by a background thread,
+    even on error.
     """
     start_time = time.time()
     try:
@@ -37,17 +63,15 @@ async def log_requests(request: Request, call_next):
         status_code = 500
         response = StarletteResponse("Internal Server Error", status_code=500)
     duration_ms = (time.time() - start_time) * 1000
-    db = SessionLocal()
-    try:
-        create_request_log(
-            db=db,
-            http_method=request.method,
-            endpoint=request.url.path,
-            status_code=status_code,
-            duration_ms=duration_ms,
-        )
-    finally:
-        db.close()
+    request_log_buffer.enqueue(
+        {
+            "http_method": request.method,
+            "endpoint": request.url.path,
+            "status_code": status_code,
+            "duration_ms": duration_ms,
+            "created_ts": datetime.utcnow(),
+        }
+    )
     return response
 
 
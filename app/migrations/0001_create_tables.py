@@ -0,0 +1,104 @@
+"""
+Baseline: the schema as it was before versioned migrations, frozen here so
+that later changes to app.models do not alter what this migration creates.
+Later migrations add their own tables and indexes.
+"""
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+)
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+Table(
+    "tb_books",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("title", String, nullable=False),
+    Column("category", String, nullable=False),
+    Column("rating", Integer, nullable=False),
+    Column("description", String, nullable=False),
+    Column("upc", String, nullable=False, unique=True),
+    Column("product_type", String, nullable=False),
+    Column("price_excl_tax", Float, nullable=False),
+    Column("price_incl_tax", Float, nullable=False),
+    Column("tax", Float, nullable=False),
+    Column("num_available", Integer, nullable=False),
+    Column("num_reviews", Integer, nullable=False),
+    Column("image_url", String, nullable=False),
+)
+
+Table(
+    "request_logs",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("http_method", String, nullable=False),
+    Column("endpoint", String, nullable=False),
+    Column("status_code", Integer, nullable=False),
+    Column("duration_ms", Float, nullable=False),
+    Column("created_ts", DateTime, nullable=False),
+)
+
+Table(
+    "tb_scrape_pages",
+    metadata,
+    Column("url", String, primary_key=True),
+    Column("etag", String, nullable=True),
+    Column("last_modified", String, nullable=True),
+    Column("content_hash", String, nullable=False),
+    Column("updated_ts", DateTime, nullable=False),
+)
+
+Table(
+    "tb_dataset_version",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("updated_ts", DateTime, nullable=False),
+)
+
+Table(
+    "tb_scrape_jobs",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("status", String, nullable=False),
+    Column("mode", String, nullable=False),
+    Column("pages", Integer, nullable=False),
+    Column("pages_done", Integer, nullable=False),
+    Column("books_written", Integer, nullable=False),
+    Column("error", String, nullable=True),
+    Column("cancel_requested", Boolean, nullable=False),
+    Column("active_key", String, nullable=True, unique=True),
+    Column("created_ts", DateTime, nullable=False),
+    Column("started_ts", DateTime, nullable=True),
+    Column("heartbeat_ts", DateTime, nullable=True),
+    Column("finished_ts", DateTime, nullable=True),
+    Column("duration_s", Float, nullable=True),
+)
+
+Table(
+    "tb_scrape_leases",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("job_id", Integer, nullable=False, index=True),
+    Column("page_start", Integer, nullable=False),
+    Column("page_count", Integer, nullable=False),
+    Column("status", String, nullable=False),
+    Column("worker_id", String, nullable=True),
+    Column("claim_token", String, nullable=True),
+    Column("lease_expires_ts", DateTime, nullable=True),
+    Column("attempts", Integer, nullable=False),
+    Column("books_written", Integer, nullable=False),
+)
+
+
+def upgrade(connection: Connection):
+    metadata.create_all(bind=connection, checkfirst=True)
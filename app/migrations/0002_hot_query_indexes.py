@@ -0,0 +1,55 @@
+"""
+Indexes for hot queries on tables created before they were declared:
+tb_books sort/filter/group-by columns and request_logs dashboard filters.
+"""
+
+from sqlalchemy import Column, DateTime, Float, Index, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+# Only the indexed columns; the tables themselves exist since 0001.
+books = Table(
+    "tb_books",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String),
+    Column("category", String),
+    Column("rating", Integer),
+    Column("price_incl_tax", Float),
+)
+request_logs = Table(
+    "request_logs",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("endpoint", String),
+    Column("status_code", Integer),
+    Column("created_ts", DateTime),
+)
+
+INDEXES = [
+    Index("ix_tb_books_price_incl_tax_id", books.c.price_incl_tax, books.c.id),
+    Index("ix_tb_books_rating_id", books.c.rating, books.c.id),
+    Index("ix_tb_books_title_id", books.c.title, books.c.id),
+    Index(
+        "ix_tb_books_category_price_incl_tax",
+        books.c.category,
+        books.c.price_incl_tax,
+    ),
+    Index("ix_request_logs_created_ts", request_logs.c.created_ts),
+    Index(
+        "ix_request_logs_endpoint_created_ts",
+        request_logs.c.endpoint,
+        request_logs.c.created_ts,
+    ),
+    Index(
+        "ix_request_logs_status_code_created_ts",
+        request_logs.c.status_code,
+        request_logs.c.created_ts,
+    ),
+]
+
+
+def upgrade(connection: Connection):
+    for index in INDEXES:
+        index.create(connection, checkfirst=True)
@@ -0,0 +1,10 @@
+"""
+PostgreSQL full-text and trigram search indexes (see app.search).
+"""
+
+from sqlalchemy.engine import Connection
+from app.search import create_search_indexes
+
+
+def upgrade(connection: Connection):
+    create_search_indexes(connection)
@@ -0,0 +1,42 @@
+"""
+Materialized catalog aggregates (see app.aggregates), computed once for
+the existing catalog.
+"""
+
+from sqlalchemy import JSON, Column, DateTime, Float, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+from app.aggregates import refresh_aggregates
+
+metadata = MetaData()
+
+Table(
+    "tb_catalog_stats",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("total_books", Integer, nullable=False),
+    Column("average_price", Float, nullable=False),
+    Column("min_price", Float, nullable=False),
+    Column("max_price", Float, nullable=False),
+    Column("median_price", Float, nullable=False),
+    Column("p90_price", Float, nullable=False),
+    Column("total_stock", Integer, nullable=False),
+    Column("rating_distribution", JSON, nullable=False),
+    Column("computed_ts", DateTime, nullable=False),
+)
+
+Table(
+    "tb_category_stats",
+    metadata,
+    Column("category", String, primary_key=True),
+    Column("total_books", Integer, nullable=False),
+    Column("average_price", Float, nullable=False),
+    Column("median_price", Float, nullable=False),
+    Column("p90_price", Float, nullable=False),
+    Column("total_stock", Integer, nullable=False),
+)
+
+
+def upgrade(connection: Connection):
+    metadata.create_all(bind=connection, checkfirst=True)
+    refresh_aggregates(connection)
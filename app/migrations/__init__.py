@@ -0,0 +1,107 @@
+"""
+Versioned schema migrations.
+Each migration is a module in this package named <NNNN>_<name>.py with an
+upgrade(connection) function. migrate() applies pending migrations in
+order, each in its own transaction, and records them in the
+schema_migrations table. Migrations must be idempotent (checkfirst /
+IF NOT EXISTS), so databases created before versioning can be adopted.
+
+Run with `python -m app.migrations` (also run at API startup); see
+app/migrations/__main__.py for the status and EXPLAIN checks.
+"""
+
+import importlib
+import re
+from datetime import datetime
+from pathlib import Path
+from types import ModuleType
+from typing import List, Tuple
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+MIGRATION_RE = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+# Any constant: serializes migration runs of several processes on PostgreSQL
+ADVISORY_LOCK_ID = 7243017
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_ts", DateTime, nullable=False),
+)
+
+
+def discover() -> List[Tuple[int, str, ModuleType]]:
+    """
+    All migrations in this package as (version, name, module), in order.
+    """
+    migrations = []
+    for path in sorted(Path(__file__).parent.glob("[0-9]*.py")):
+        match = MIGRATION_RE.match(path.name)
+        if match:
+            module = importlib.import_module(f"{__name__}.{path.stem}")
+            migrations.append((int(match.group(1)), match.group(2), module))
+    return migrations
+
+
+def applied_versions(connection: Connection) -> set:
+    """
+    Versions recorded in schema_migrations.
+    """
+    schema_migrations.create(connection, checkfirst=True)
+    return set(connection.scalars(select(schema_migrations.c.version)))
+
+
+def _lock(connection: Connection):
+    if connection.dialect.name == "postgresql":
+        connection.execute(
+            text("SELECT pg_advisory_xact_lock(:id)"), {"id": ADVISORY_LOCK_ID}
+        )
+
+
+def migrate(engine: Engine) -> List[int]:
+    """
+    Apply pending migrations. Returns the versions applied by this call.
+    """
+    applied = []
+    for version, name, module in discover():
+        with engine.begin() as connection:
+            _lock(connection)
+            if version in applied_versions(connection):
+                continue
+            module.upgrade(connection)
+            try:
+                with connection.begin_nested():
+                    connection.execute(
+                        insert(schema_migrations).values(
+                            version=version, name=name, applied_ts=datetime.utcnow()
+                        )
+                    )
+            except IntegrityError:
+                # Another process applied it concurrently (SQLite has no
+                # advisory lock); the migration itself is idempotent.
+                continue
+        applied.append(version)
+    return applied
+
+
+def status(engine: Engine) -> List[Tuple[int, str, bool]]:
+    """
+    (version, name, applied) for every known migration.
+    """
+    with engine.begin() as connection:
+        done = applied_versions(connection)
+    return [(version, name, version in done) for version, name, _ in discover()]
@@ -0,0 +1,139 @@
+"""
+Migration command line.
+
+Usage:
+    python -m app.migrations            apply pending migrations
+    python -m app.migrations --status   list migrations and whether applied
+    python -m app.migrations --explain  check that every hot query uses an
+                                        index (EXPLAIN); exits 1 otherwise
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from sqlalchemy import Select, select
+from sqlalchemy.engine import Connection
+from app import crud, models
+from app.database import engine
+from app.migrations import migrate, status
+
+
+def hot_queries() -> Dict[str, Select]:
+    """
+    Queries behind the busiest endpoints and the logs dashboard.
+    """
+    since = datetime.utcnow() - timedelta(days=7)
+    until = datetime.utcnow()
+    logs = models.RequestLog
+    cursor_book = models.Book(id=100, price_incl_tax=20.0, rating=3, title="M")
+    queries = {
+        "book by id": crud.book_by_id_statement(1),
+        "price range": crud.price_range_statement(10, 20, 0, 100),
+        "top rated": crud.top_rated_statement(0, 100),
+        "catalog stats": crud.catalog_stats_statement(),
+        "category stats": crud.category_stats_statement(),
+        "categories": crud.categories_statement(),
+        "logs by time": select(logs).where(
+            logs.created_ts >= since, logs.created_ts < until
+        ),
+        "logs by endpoint": select(logs).where(
+            logs.endpoint == "/api/v1/books/",
+            logs.created_ts >= since,
+            logs.created_ts < until,
+        ),
+        "logs by status": select(logs).where(
+            logs.status_code.between(500, 599),
+            logs.created_ts >= since,
+            logs.created_ts < until,
+        ),
+        "log endpoints": select(logs.endpoint).distinct(),
+    }
+    for sort in crud.BOOK_SORT_KEYS:
+        cursor = crud.encode_cursor(sort, False, cursor_book)
+        queries[f"books by {sort}"] = crud.books_page_statement(sort, limit=100)
+        queries[f"books by {sort} after cursor"] = crud.books_page_statement(
+            sort, cursor=cursor, limit=100
+        )
+    return queries
+
+
+def explain(connection: Connection, stmt: Select) -> List[str]:
+    """
+    Query plan lines of a statement.
+    """
+    compiled = stmt.compile(dialect=connection.dialect)
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)
+        return [row[-1] for row in rows]
+    rows = connection.exec_driver_sql(f"EXPLAIN {compiled}", params)
+    return [row[0] for row in rows]
+
+
+def uses_index(plan: List[str], limited: bool = False) -> bool:
+    """
+    False if the plan reads a table without an index. For a LIMIT query,
+    a SQLite rowid-order scan without a sort step stops early and is fine.
+    """
+    in_order = not any("TEMP B-TREE" in line for line in plan)
+    for line in plan:
+        if "Seq Scan" in line:
+            return False
+        if line.startswith("SCAN ") and " INDEX" not in line:
+            if not (limited and in_order):
+                return False
+    return True
+
+
+def check_query(connection: Connection, stmt: Select) -> Tuple[bool, List[str]]:
+    """
+    Whether a statement's plan uses an index, and the plan.
+    """
+    plan = explain(connection, stmt)
+    limited = " LIMIT " in str(stmt.compile(dialect=connection.dialect))
+    return uses_index(plan, limited), plan
+
+
+def check_indexes() -> bool:
+    """
+    EXPLAIN every hot query and report the ones that scan a table.
+    """
+    ok = True
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Small tables would make the planner prefer seq scans anyway.
+            connection.exec_driver_sql("SET enable_seqscan = off")
+        for name, stmt in hot_queries().items():
+            passed, plan = check_query(connection, stmt)
+            ok = ok and passed
+            print(f"{'ok' if passed else 'FAIL':<5} {name}")
+            if not passed:
+                for line in plan:
+                    print(f"      {line}")
+        connection.rollback()
+    return ok
+
+
+def main():
+    """
+    Apply migrations, or report status / index usage.
+    """
+    parser = argparse.ArgumentParser(description="Schema migrations")
+    parser.add_argument("--status", action="store_true")
+    parser.add_argument("--explain", action="store_true")
+    args = parser.parse_args()
+    if args.status:
+        for version, name, applied in status(engine):
+            print(f"{version:04d} {name:<30} {'applied' if applied else 'pending'}")
+    elif args.explain:
+        sys.exit(0 if check_indexes() else 1)
+    else:
+        applied = migrate(engine)
+        print(f"Applied {len(applied)} migration(s): {applied}")
+
+
+if __name__ == "__main__":
+    main()
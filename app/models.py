@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Index, JSON
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
 
@@ -26,6 +26,16 @@ class Book(Base):
     num_reviews = Column(Integer, nullable=False)
     image_url = Column(String, nullable=False)
 
+    # Keyset pagination orders (see crud.BOOK_SORT_KEYS), which also serve
+    # price-range and rating filters; category covers the per-category stats.
+    # Existing databases get new indexes through app.migrations.
+    __table_args__ = (
+        Index("ix_tb_books_price_incl_tax_id", "price_incl_tax", "id"),
+        Index("ix_tb_books_rating_id", "rating", "id"),
+        Index("ix_tb_books_title_id", "title", "id"),
+        Index("ix_tb_books_category_price_incl_tax", "category", "price_incl_tax"),
+    )
+
 
 class RequestLog(Base):
     """
@@ -40,3 +50,121 @@ class RequestLog(Base):
     status_code = Column(Integer, nullable=False)
     duration_ms = Column(Float, nullable=False)
     created_ts = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Dashboard filters: time range, optionally by endpoint or status
+    __table_args__ = (
+        Index("ix_request_logs_created_ts", "created_ts"),
+        Index("ix_request_logs_endpoint_created_ts", "endpoint", "created_ts"),
+        Index("ix_request_logs_status_code_created_ts", "status_code", "created_ts"),
+    )
+
+
+class ScrapePage(Base):
+    """
+    SQLAlchemy model for the state of scraped pages, used by incremental
+    scraping (HTTP validators and content hash per URL).
+    """
+
+    __tablename__ = "tb_scrape_pages"
+
+    url = Column(String, primary_key=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String, nullable=False)
+    updated_ts = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class DatasetVersion(Base):
+    """
+    SQLAlchemy model for the catalog's dataset version (a single row),
+    bumped in the same transaction as every change to tb_books. Caches and
+    in-process indexes of the catalog are keyed by it.
+    """
+
+    __tablename__ = "tb_dataset_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_ts = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class CatalogStats(Base):
+    """
+    SQLAlchemy model for catalog-wide aggregates (a single row), recomputed
+    by app.aggregates in the same transaction as every change to tb_books.
+    """
+
+    __tablename__ = "tb_catalog_stats"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    total_books = Column(Integer, nullable=False)
+    average_price = Column(Float, nullable=False)
+    min_price = Column(Float, nullable=False)
+    max_price = Column(Float, nullable=False)
+    median_price = Column(Float, nullable=False)
+    p90_price = Column(Float, nullable=False)
+    total_stock = Column(Integer, nullable=False)
+    rating_distribution = Column(JSON, nullable=False)
+    computed_ts = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class CategoryStats(Base):
+    """
+    SQLAlchemy model for per-category aggregates, maintained with
+    CatalogStats.
+    """
+
+    __tablename__ = "tb_category_stats"
+
+    category = Column(String, primary_key=True)
+    total_books = Column(Integer, nullable=False)
+    average_price = Column(Float, nullable=False)
+    median_price = Column(Float, nullable=False)
+    p90_price = Column(Float, nullable=False)
+    total_stock = Column(Integer, nullable=False)
+
+
+class ScrapeJob(Base):
+    """
+    SQLAlchemy model for scraping jobs run by the worker process.
+    """
+
+    __tablename__ = "tb_scrape_jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    status = Column(String, nullable=False, default="queued")
+    mode = Column(String, nullable=False, default="full")
+    pages = Column(Integer, nullable=False)
+    pages_done = Column(Integer, nullable=False, default=0)
+    books_written = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    # "active" while queued or running, NULL afterwards: the unique
+    # constraint allows at most one active job at a time.
+    active_key = Column(String, nullable=True, unique=True)
+    created_ts = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_ts = Column(DateTime, nullable=True)
+    heartbeat_ts = Column(DateTime, nullable=True)
+    finished_ts = Column(DateTime, nullable=True)
+    duration_s = Column(Float, nullable=True)
+
+
+class ScrapeLease(Base):
+    """
+    SQLAlchemy model for a page range of a scraping job, leased to one
+    worker at a time. Expired leases are reclaimed by other workers.
+    """
+
+    __tablename__ = "tb_scrape_leases"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(Integer, nullable=False, index=True)
+    page_start = Column(Integer, nullable=False)
+    page_count = Column(Integer, nullable=False)
+    status = Column(String, nullable=False, default="pending")
+    worker_id = Column(String, nullable=True)
+    claim_token = Column(String, nullable=True)
+    lease_expires_ts = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    books_written = Column(Integer, nullable=False, default=0)
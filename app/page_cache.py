@@ -0,0 +1,242 @@
+"""
+Content-addressed on-disk cache of raw scraped HTML.
+Pages are stored gzip-compressed under their SHA-256 content hash, and a
+JSON manifest maps each URL to its current hash so lookups never need to
+stat the object store. Used for offline replay of scraping runs.
+Several processes may share one directory: flush merges this instance's
+changes into the manifest on disk under a file lock, and only then evicts
+and deletes objects that the merged manifest no longer references.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+SCRAPE_CACHE_DIR = os.environ.get("SCRAPE_CACHE_DIR")
+SCRAPE_CACHE_MAX_BYTES = int(os.environ.get("SCRAPE_CACHE_MAX_BYTES", 512 * 1024**2))
+
+
+class PageCache:
+    """
+    Compressed, content-addressed HTML cache with size-based LRU eviction.
+    """
+
+    MANIFEST = "manifest.json"
+    LOCK = "manifest.lock"
+
+    def __init__(self, directory: str, max_bytes: int = SCRAPE_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # URLs put since the manifest was last read or flushed, and the
+        # content of their objects, rewritten by flush if another process
+        # deleted one in the meantime.
+        self._changed = set()
+        self._pending: Dict[str, bytes] = {}
+        (self.directory / "objects").mkdir(parents=True, exist_ok=True)
+        manifest = self._read_manifest()
+        # urls: url -> {"hash", "fetched_ts", ...}; objects: hash -> size
+        self.urls = manifest["urls"]
+        self.objects = manifest["objects"]
+        self._refs = self._count_refs(self.urls)
+
+    def _object_path(self, content_hash: str) -> Path:
+        return self.directory / "objects" / content_hash[:2] / f"{content_hash}.html.gz"
+
+    def _read_manifest(self) -> dict:
+        path = self.directory / self.MANIFEST
+        if not path.exists():
+            return {"urls": {}, "objects": {}}
+        return json.loads(path.read_text())
+
+    @staticmethod
+    def _count_refs(urls: dict) -> Dict[str, int]:
+        refs = {}
+        for entry in urls.values():
+            refs[entry["hash"]] = refs.get(entry["hash"], 0) + 1
+        return refs
+
+    @contextmanager
+    def _file_lock(self):
+        """
+        Exclusive lock on the manifest, held across processes (flock on
+        POSIX, a one-byte msvcrt lock on Windows).
+        """
+        with open(self.directory / self.LOCK, "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                return
+            lock_file.seek(0)
+            while True:
+                try:
+                    # LK_LOCK retries for about 10 seconds before failing.
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def total_bytes(self) -> int:
+        """
+        Compressed size of all stored objects.
+        """
+        return sum(self.objects.values())
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """
+        Return the manifest entry for a URL, if cached.
+        """
+        return self.urls.get(url)
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        Return the cached HTML for a URL, or None.
+        """
+        entry = self.urls.get(url)
+        if entry is None:
+            return None
+        try:
+            data = self._object_path(entry["hash"]).read_bytes()
+        except FileNotFoundError:
+            return None
+        return gzip.decompress(data).decode("utf-8")
+
+    def put(self, url: str, html: str, **meta) -> str:
+        """
+        Store a page and point its URL at the new content hash.
+        Extra keyword arguments (e.g. etag) are kept in the manifest entry.
+        The object is written outside the lock, unless it is already on disk
+        (stored by any process); its content is kept until the next flush.
+        """
+        data = html.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        size = self._write_object(content_hash, data)
+        with self._lock:
+            self.objects[content_hash] = size
+            old = self.urls.get(url)
+            self.urls[url] = {"hash": content_hash, "fetched_ts": time.time(), **meta}
+            self._refs[content_hash] = self._refs.get(content_hash, 0) + 1
+            if old:
+                self._release(old["hash"])
+            self._changed.add(url)
+            self._pending[content_hash] = data
+        return content_hash
+
+    def _write_object(self, content_hash: str, data: bytes) -> int:
+        """
+        Write an object file atomically and return its compressed size.
+        """
+        path = self._object_path(content_hash)
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            pass
+        path.parent.mkdir(exist_ok=True)
+        compressed = gzip.compress(data, compresslevel=6)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(compressed)
+        os.replace(tmp, path)
+        return len(compressed)
+
+    def _release(self, content_hash: str):
+        """
+        Drop one reference to an object. Unreferenced objects are deleted by
+        flush, once no other process's manifest can point at them.
+        """
+        self._refs[content_hash] -= 1
+        if self._refs[content_hash] == 0:
+            del self._refs[content_hash]
+
+    def _merge(self, manifest: dict):
+        """
+        Merge the URLs put by this instance into a manifest read from disk;
+        the most recently fetched entry of each URL wins. Objects this
+        instance knows of are added too, so the ones it no longer references
+        are deleted.
+        """
+        urls, objects = manifest["urls"], manifest["objects"]
+        for content_hash, size in self.objects.items():
+            objects.setdefault(content_hash, size)
+        for url in self._changed:
+            entry = self.urls.get(url)
+            if entry is None:
+                continue
+            current = urls.get(url)
+            if current is None or current["fetched_ts"] <= entry["fetched_ts"]:
+                urls[url] = entry
+                objects[entry["hash"]] = self.objects[entry["hash"]]
+
+    def _evict(self, urls: dict, objects: dict, refs: Dict[str, int]):
+        """
+        Drop least recently fetched URLs until the store fits max_bytes,
+        then delete every object no URL references.
+        """
+        total = sum(objects.values())
+        if total > self.max_bytes:
+            for url in sorted(urls, key=lambda u: urls[u]["fetched_ts"]):
+                if total <= self.max_bytes:
+                    break
+                content_hash = urls.pop(url)["hash"]
+                refs[content_hash] -= 1
+                if refs[content_hash] == 0:
+                    del refs[content_hash]
+                    total -= objects.get(content_hash, 0)
+        for content_hash in [h for h in objects if h not in refs]:
+            del objects[content_hash]
+            self._object_path(content_hash).unlink(missing_ok=True)
+
+    def flush(self):
+        """
+        Merge this instance's changes into the manifest on disk, evict down
+        to max_bytes, make sure every object this instance put and the
+        manifest still references exists, and persist the result atomically.
+        """
+        with self._lock, self._file_lock():
+            if not self._changed:
+                return
+            manifest = self._read_manifest()
+            self._merge(manifest)
+            refs = self._count_refs(manifest["urls"])
+            self._evict(manifest["urls"], manifest["objects"], refs)
+            # Objects that were already on disk when put() skipped writing
+            # them may have been evicted by another process since.
+            for content_hash, data in self._pending.items():
+                if content_hash in refs:
+                    size = self._write_object(content_hash, data)
+                    manifest["objects"][content_hash] = size
+            path = self.directory / self.MANIFEST
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(manifest))
+            os.replace(tmp, path)
+            self.urls = manifest["urls"]
+            self.objects = manifest["objects"]
+            self._refs = refs
+            self._changed.clear()
+            self._pending.clear()
+
+
+def default_cache() -> Optional[PageCache]:
+    """
+    Return the cache configured by SCRAPE_CACHE_DIR, or None if disabled.
+    """
+    return PageCache(SCRAPE_CACHE_DIR) if SCRAPE_CACHE_DIR else None
@@ -0,0 +1,217 @@
+"""
+HTML parser backends for books.toscrape.com pages.
+The lxml backend is the fast path; BeautifulSoup is kept as a fallback
+for environments without lxml.
+"""
+
+import hashlib
+import os
+import re
+from bs4 import BeautifulSoup
+from typing import Dict, List, Tuple
+from .schemas import BookCreate
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # pragma: no cover - lxml is an optional dependency
+    etree = None
+    lxml_html = None
+
+NON_PRICE_RE = re.compile(r"[^0-9.]")
+DIGITS_RE = re.compile(r"\d+")
+RATINGS = {"One": 1, "Two": 2, "Three": 3, "Four": 4, "Five": 5}
+
+
+def _price(text: str) -> float:
+    return float(NON_PRICE_RE.sub("", text))
+
+
+def _available(text: str) -> int:
+    match = DIGITS_RE.search(text)
+    return int(match.group()) if match else 0
+
+
+def listing_fingerprint(text: str, rating_class: str) -> str:
+    """
+    Hash of what a listing page shows for one product (title, price,
+    availability, rating), used to detect changed products without
+    fetching their pages.
+    """
+    normalized = " ".join(text.split()) + "|" + rating_class
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def build_book(
+    title: str,
+    category: str,
+    rating_class: str,
+    description: str,
+    image_url: str,
+    info: Dict[str, str],
+) -> BookCreate:
+    """
+    Build a BookCreate from the raw strings extracted by a parser backend.
+    """
+    return BookCreate(
+        title=title,
+        category=category,
+        rating=RATINGS[rating_class],
+        description=description,
+        image_url=image_url,
+        upc=info["UPC"],
+        product_type=info["Product Type"],
+        price_excl_tax=_price(info["Price (excl. tax)"]),
+        price_incl_tax=_price(info["Price (incl. tax)"]),
+        tax=_price(info["Tax"]),
+        num_available=_available(info["Availability"]),
+        num_reviews=int(info["Number of reviews"]),
+    )
+
+
+class BeautifulSoupParser:
+    """
+    Parser backend based on BeautifulSoup and the stdlib html.parser.
+    """
+
+    name = "bs4"
+
+    def parse_listing(self, html: str) -> List[str]:
+        """
+        Extract the relative product links from a catalogue listing page.
+        """
+        soup = BeautifulSoup(html, "html.parser")
+        ls_articles = soup.find_all("article", class_="product_pod")
+        return [link.h3.a["href"] for link in ls_articles]
+
+    def parse_listing_items(self, html: str) -> List[Tuple[str, str]]:
+        """
+        Extract (relative product link, listing fingerprint) pairs.
+        """
+        soup = BeautifulSoup(html, "html.parser")
+        items = []
+        for article in soup.find_all("article", class_="product_pod"):
+            rating = article.find("p", class_="star-rating")
+            rating_class = " ".join(rating["class"]) if rating else ""
+            items.append(
+                (
+                    article.h3.a["href"],
+                    listing_fingerprint(article.get_text(), rating_class),
+                )
+            )
+        return items
+
+    def parse_book(self, html: str, site_url: str) -> BookCreate:
+        """
+        Extract all book attributes from a product page.
+        """
+        book_soup = BeautifulSoup(html, "html.parser")
+
+        breadcrumbs = book_soup.find("ul", class_="breadcrumb").find_all("li")
+
+        desc_header = book_soup.find("div", id="product_description")
+        desc_p = desc_header.find_next_sibling("p") if desc_header else None
+
+        info_table = book_soup.find("table", class_="table table-striped")
+        info = {
+            row.th.get_text(strip=True): row.td.get_text(strip=True)
+            for row in info_table.find_all("tr")
+        }
+
+        return build_book(
+            title=book_soup.find("h1").get_text(strip=True),
+            category=breadcrumbs[-2].get_text(strip=True),
+            rating_class=book_soup.find("p", class_="star-rating")["class"][1],
+            description=desc_p.get_text(strip=True) if desc_p else "",
+            image_url=site_url + book_soup.find("div", class_="item active").img["src"],
+            info=info,
+        )
+
+
+if etree is not None:
+    XP_LISTING_LINKS = etree.XPath(
+        "//article[contains(concat(' ', @class, ' '), ' product_pod ')]/h3/a/@href"
+    )
+    XP_LISTING_ARTICLES = etree.XPath(
+        "//article[contains(concat(' ', @class, ' '), ' product_pod ')]"
+    )
+    XP_ARTICLE_RATING = etree.XPath(
+        "string(.//p[contains(concat(' ', @class, ' '), ' star-rating ')][1]/@class)"
+    )
+    XP_TITLE = etree.XPath("(//h1)[1]")
+    XP_BREADCRUMBS = etree.XPath("(//ul[@class='breadcrumb'])[1]/li")
+    XP_RATING = etree.XPath(
+        "(//p[contains(concat(' ', @class, ' '), ' star-rating ')])[1]/@class"
+    )
+    XP_DESCRIPTION = etree.XPath(
+        "(//div[@id='product_description'])[1]/following-sibling::p[1]"
+    )
+    XP_IMAGE = etree.XPath("(//div[@class='item active'])[1]/img/@src")
+    XP_INFO_ROWS = etree.XPath("(//table[@class='table table-striped'])[1]//tr")
+
+
+class LxmlParser:
+    """
+    Fast parser backend: one lxml tree build and precompiled XPath lookups.
+    """
+
+    name = "lxml"
+
+    def parse_listing(self, html: str) -> List[str]:
+        """
+        Extract the relative product links from a catalogue listing page.
+        """
+        return [str(href) for href in XP_LISTING_LINKS(lxml_html.fromstring(html))]
+
+    def parse_listing_items(self, html: str) -> List[Tuple[str, str]]:
+        """
+        Extract (relative product link, listing fingerprint) pairs.
+        """
+        items = []
+        for article in XP_LISTING_ARTICLES(lxml_html.fromstring(html)):
+            rating_class = " ".join(str(XP_ARTICLE_RATING(article)).split())
+            items.append(
+                (
+                    article.find("h3/a").get("href"),
+                    listing_fingerprint(article.text_content(), rating_class),
+                )
+            )
+        return items
+
+    def parse_book(self, html: str, site_url: str) -> BookCreate:
+        """
+        Extract all book attributes from a product page.
+        """
+        root = lxml_html.fromstring(html)
+
+        description = XP_DESCRIPTION(root)
+        info = {}
+        for row in XP_INFO_ROWS(root):
+            th = row.find("th")
+            td = row.find("td")
+            if th is not None and td is not None:
+                info[th.text_content().strip()] = td.text_content().strip()
+
+        return build_book(
+            title=XP_TITLE(root)[0].text_content().strip(),
+            category=XP_BREADCRUMBS(root)[-2].text_content().strip(),
+            rating_class=XP_RATING(root)[0].split()[1],
+            description=description[0].text_content().strip() if description else "",
+            image_url=site_url + XP_IMAGE(root)[0],
+            info=info,
+        )
+
+
+PARSERS = {"bs4": BeautifulSoupParser}
+if lxml_html is not None:
+    PARSERS["lxml"] = LxmlParser
+
+SCRAPE_PARSER = os.environ.get("SCRAPE_PARSER", "lxml" if "lxml" in PARSERS else "bs4")
+
+
+def get_parser(name: str = None):
+    """
+    Return a parser backend by name, falling back to BeautifulSoup
+    when the requested backend is not installed.
+    """
+    return PARSERS.get(name or SCRAPE_PARSER, BeautifulSoupParser)()
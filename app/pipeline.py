@@ -0,0 +1,91 @@
+"""
+Streaming scrape-to-database pipeline.
+A producer thread drains a book iterator into a bounded queue (backpressure)
+while the calling thread writes fixed-size batches to the database.
+"""
+
+import os
+import queue
+import threading
+from typing import Callable, Iterable, List
+from .schemas import BookCreate
+
+PIPELINE_BATCH_SIZE = int(os.environ.get("PIPELINE_BATCH_SIZE", 200))
+PIPELINE_QUEUE_SIZE = int(os.environ.get("PIPELINE_QUEUE_SIZE", 1000))
+
+_DONE = object()
+
+
+class _ProducerError:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def run_pipeline(
+    books: Iterable[BookCreate],
+    sink: Callable[[List[BookCreate]], object],
+    batch_size: int = PIPELINE_BATCH_SIZE,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+) -> int:
+    """
+    Stream books from a producer into a sink in batches.
+    The sink runs in the calling thread, so it may use a DB session.
+    Args:
+            books (Iterable[BookCreate]): Producer, e.g. scraping.iter_books()
+            sink (Callable): Called with each batch of at most batch_size books
+            batch_size (int): Books per sink call (default=200)
+            queue_size (int): Maximum books buffered between the two sides
+    Returns:
+            int: Number of books written
+    """
+    items: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(books)
+        try:
+            for book in iterator:
+                if not put(book):
+                    break
+            else:
+                put(_DONE)
+        except BaseException as exc:
+            put(_ProducerError(exc))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name="scrape-producer", daemon=True)
+    producer.start()
+
+    written = 0
+    batch: List[BookCreate] = []
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _ProducerError):
+                raise item.exc
+            batch.append(item)
+            if len(batch) >= batch_size:
+                sink(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            sink(batch)
+            written += len(batch)
+    finally:
+        stop.set()
+        producer.join()
+    return written
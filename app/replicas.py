@@ -0,0 +1,227 @@
+"""
+Read-replica routing for read-only endpoints.
+DB_REPLICA_URLS is a comma-separated list of replica database URLs (same
+format as DATABASE_URL). get_read_db picks a healthy replica round-robin
+and falls back to the primary when none is usable. Writes (scraping jobs,
+ingest, request logs) always use the primary.
+A replica is skipped while:
+    its replication lag exceeds DB_REPLICA_MAX_LAG_S (default 30), checked
+    at most every DB_REPLICA_CHECK_S seconds (default 5)
+    it is cooling down for DB_REPLICA_COOLDOWN_S seconds (default 30) after
+    DB_REPLICA_MAX_FAILURES consecutive connection errors (default 3)
+The lag probe uses PostgreSQL's WAL functions; replicas on other backends
+are assumed to be in sync and are only checked for connectivity.
+A request whose replica cannot be reached is served by the primary.
+"""
+
+import itertools
+import logging
+import os
+import time
+from typing import List, Tuple
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from app.database import AsyncSessionLocal, async_engine, async_url
+from app.db_pool import instrument, pool_options, pool_stats
+
+DB_REPLICA_URLS = [
+    url.strip()
+    for url in os.environ.get("DB_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+DB_REPLICA_MAX_LAG_S = float(os.environ.get("DB_REPLICA_MAX_LAG_S", 30))
+DB_REPLICA_CHECK_S = float(os.environ.get("DB_REPLICA_CHECK_S", 5))
+DB_REPLICA_MAX_FAILURES = int(os.environ.get("DB_REPLICA_MAX_FAILURES", 3))
+DB_REPLICA_COOLDOWN_S = float(os.environ.get("DB_REPLICA_COOLDOWN_S", 30))
+
+# Errors of an unreachable database: drivers like asyncpg raise socket errors
+# (e.g. ConnectionRefusedError) without wrapping them in a DBAPIError.
+CONNECTION_ERRORS = (DBAPIError, OSError)
+
+logger = logging.getLogger(__name__)
+
+# Zero when the replica has replayed everything it received, otherwise the
+# age of the last replayed transaction.
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class EngineHealth:
+    """
+    Health state of one read engine.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.name = engine.url.render_as_string(hide_password=True)
+        self.failures = 0
+        self.down_until = 0.0
+        self.lag_s = 0.0
+        self.checked = 0.0
+        self.reads = 0
+
+    def available(self, max_lag_s: float) -> bool:
+        return time.monotonic() >= self.down_until and self.lag_s <= max_lag_s
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "healthy": time.monotonic() >= self.down_until,
+            "failures": self.failures,
+            "lag_s": self.lag_s,
+            "reads": self.reads,
+            "pool": pool_stats(self.engine.sync_engine),
+        }
+
+
+class ReadRouter:
+    """
+    Chooses the engine for each read-only request.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: List[AsyncEngine],
+        max_lag_s: float = DB_REPLICA_MAX_LAG_S,
+        check_s: float = DB_REPLICA_CHECK_S,
+        max_failures: int = DB_REPLICA_MAX_FAILURES,
+        cooldown_s: float = DB_REPLICA_COOLDOWN_S,
+    ):
+        self.primary = EngineHealth(primary)
+        self.replicas = [EngineHealth(engine) for engine in replicas]
+        self.max_lag_s = max_lag_s
+        self.check_s = check_s
+        self.max_failures = max_failures
+        self.cooldown_s = cooldown_s
+        self.fallbacks = 0
+        self._next = itertools.count()
+
+    async def pick(self) -> EngineHealth:
+        """
+        Next available replica in round-robin order, or the primary.
+        """
+        if not self.replicas:
+            return self.primary
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            await self._check_lag(replica)
+            if replica.available(self.max_lag_s):
+                return replica
+        self.fallbacks += 1
+        return self.primary
+
+    async def _check_lag(self, replica: EngineHealth):
+        """
+        Refresh the replica's replication lag (PostgreSQL only; other
+        backends report no lag).
+        """
+        now = time.monotonic()
+        if now - replica.checked < self.check_s or now < replica.down_until:
+            return
+        replica.checked = now
+        if replica.engine.dialect.name != "postgresql":
+            return
+        try:
+            async with replica.engine.connect() as conn:
+                lag = (await conn.execute(LAG_QUERY)).scalar()
+            replica.lag_s = float(lag or 0.0)
+            self.record_success(replica)
+        except CONNECTION_ERRORS as exc:
+            logger.warning("Lag check failed for replica %s: %s", replica.name, exc)
+            self.record_failure(replica)
+
+    async def connect(
+        self, health: EngineHealth = None
+    ) -> Tuple[EngineHealth, AsyncSession]:
+        """
+        Session connected to the given (by default, the picked) engine. A
+        replica that cannot be reached counts as a failure and the primary
+        is used instead.
+        """
+        if health is None:
+            health = await self.pick()
+        db = AsyncSessionLocal(bind=health.engine)
+        if health is self.primary:
+            return health, db
+        try:
+            await db.connection()
+        except CONNECTION_ERRORS as exc:
+            logger.warning("Cannot connect to replica %s: %s", health.name, exc)
+            await db.close()
+            self.record_failure(health)
+            self.fallbacks += 1
+            return self.primary, AsyncSessionLocal(bind=self.primary.engine)
+        return health, db
+
+    def record_success(self, health: EngineHealth):
+        health.failures = 0
+
+    def record_failure(self, health: EngineHealth):
+        health.failures += 1
+        if health is not self.primary and health.failures >= self.max_failures:
+            health.down_until = time.monotonic() + self.cooldown_s
+            health.failures = 0
+
+    def stats(self) -> dict:
+        """
+        Per-engine health, lag and read counts.
+        """
+        return {
+            "fallbacks": self.fallbacks,
+            "primary": {"reads": self.primary.reads},
+            "replicas": [replica.stats() for replica in self.replicas],
+        }
+
+    async def dispose(self):
+        """
+        Close the pooled connections of the primary and every replica.
+        """
+        for health in [self.primary, *self.replicas]:
+            await health.engine.dispose()
+
+
+def create_replica_engine(url: str) -> AsyncEngine:
+    """
+    Async engine for a replica URL, with the same pool settings as the primary.
+    """
+    url = async_url(url)
+    engine = create_async_engine(url, **pool_options(url, is_async=True))
+    instrument(engine.sync_engine)
+    return engine
+
+
+read_router = ReadRouter(
+    async_engine, [create_replica_engine(url) for url in DB_REPLICA_URLS]
+)
+
+
+async def get_read_engine() -> EngineHealth:
+    """
+    Dependency choosing the engine that serves a read-only request, without
+    connecting to it. FastAPI caches it per request, so get_read_db and
+    other dependencies (see app.http_cache) agree on the engine.
+    """
+    return await read_router.pick()
+
+
+async def get_read_db(health: EngineHealth = Depends(get_read_engine)):
+    """
+    Dependency to get an async session for read-only endpoints, bound to a
+    replica when one is available. Connection errors count against the
+    replica's health.
+    """
+    health, db = await read_router.connect(health)
+    health.reads += 1
+    async with db:
+        try:
+            yield db
+        except CONNECTION_ERRORS:
+            read_router.record_failure(health)
+            raise
+        read_router.record_success(health)
@@ -0,0 +1,132 @@
+"""
+Reader for request log segments written by the JSONL sink.
+Segments are memory-mapped and scanned line by line; time, endpoint and
+status filters are checked on the raw bytes before a line is decoded, so
+only matching entries are parsed.
+"""
+
+import json
+import mmap
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional, Union
+
+REQUEST_LOG_DIR = os.environ.get("REQUEST_LOG_DIR", "logs/requests")
+SEGMENT_PREFIX = "requests-"
+SEGMENT_SUFFIX = ".jsonl"
+
+# Every line starts with '{"created_ts":"' followed by a 26-byte timestamp.
+TS_START = len('{"created_ts":"')
+TS_END = TS_START + len("2025-01-01T00:00:00.000000")
+
+
+def _epoch_ms(value: datetime) -> float:
+    # Naive datetimes are UTC, like RequestLog.created_ts.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp() * 1000
+
+
+def _segment_key(path: Path):
+    # requests-<start epoch ms>-<pid>.jsonl -> (start_ms, pid)
+    start_ms, pid = path.name[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)].split("-")
+    return int(start_ms), pid
+
+
+def list_segments(
+    directory: str = REQUEST_LOG_DIR,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[Path]:
+    """
+    Segment files that may hold entries between start and end, oldest first.
+    A segment is skipped when its first entry is after end, or when the
+    next segment of the same writer process starts before start.
+    """
+    start_ms = _epoch_ms(start) if start else None
+    end_ms = _epoch_ms(end) if end else None
+    by_writer = {}
+    for path in Path(directory).glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"):
+        segment_start, pid = _segment_key(path)
+        by_writer.setdefault(pid, []).append((segment_start, path))
+
+    selected = []
+    for segments in by_writer.values():
+        segments.sort()
+        for index, (segment_start, path) in enumerate(segments):
+            if end_ms is not None and segment_start > end_ms:
+                break
+            if (
+                start_ms is not None
+                and index + 1 < len(segments)
+                and segments[index + 1][0] < start_ms
+            ):
+                continue
+            selected.append((segment_start, path))
+    return [path for _, path in sorted(selected)]
+
+
+def _status_matches(status_code: int, status: Union[int, str, None]) -> bool:
+    if status is None:
+        return True
+    if isinstance(status, str):
+        # Status class such as "2xx"
+        return str(status_code)[0] == status[0]
+    return status_code == status
+
+
+def read_logs(
+    directory: str = REQUEST_LOG_DIR,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    endpoint: Optional[str] = None,
+    status: Union[int, str, None] = None,
+) -> Iterator[dict]:
+    """
+    Yield request log entries matching all given filters.
+    Args:
+            directory (str): Segment directory (REQUEST_LOG_DIR)
+            start, end (datetime): Inclusive created_ts range (UTC, naive)
+            endpoint (str): Exact request path
+            status (int | str): Exact status code, or a class such as "5xx"
+    """
+    start_key = start.isoformat(timespec="microseconds").encode() if start else None
+    end_key = end.isoformat(timespec="microseconds").encode() if end else None
+    endpoint_key = b'"endpoint":' + json.dumps(endpoint).encode() if endpoint else None
+    status_key = b'"status_code":%d' % status if isinstance(status, int) else None
+
+    for path in list_segments(directory, start, end):
+        with open(path, "rb") as f:
+            if f.seek(0, 2) == 0:
+                continue
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = 0
+                size = len(mm)
+                while pos < size:
+                    newline = mm.find(b"\n", pos)
+                    if newline == -1:
+                        # Partially written last line
+                        break
+                    ts = mm[pos + TS_START : pos + TS_END]
+                    line_start, pos = pos, newline + 1
+                    if start_key is not None and ts < start_key:
+                        continue
+                    if end_key is not None and ts > end_key:
+                        continue
+                    if (
+                        endpoint_key is not None
+                        and mm.find(endpoint_key, line_start, newline) == -1
+                    ):
+                        continue
+                    if (
+                        status_key is not None
+                        and mm.find(status_key, line_start, newline) == -1
+                    ):
+                        continue
+                    entry = json.loads(mm[line_start:newline])
+                    if endpoint is not None and entry["endpoint"] != endpoint:
+                        continue
+                    if not _status_matches(entry["status_code"], status):
+                        continue
+                    yield entry
@@ -0,0 +1,241 @@
+"""
+Buffered request logging with pluggable sinks.
+The logging middleware enqueues entries without blocking; a background
+thread hands them to the configured sink every REQUEST_LOG_FLUSH_ROWS
+entries or REQUEST_LOG_FLUSH_MS milliseconds, whichever comes first.
+Sinks (REQUEST_LOG_SINK):
+    database: bulk-insert into the request_logs table (default)
+    jsonl: append to size/time-rotated JSONL segments in REQUEST_LOG_DIR,
+        readable with app.request_log_reader
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+from app.database import SessionLocal
+from app import crud
+from app.request_log_reader import REQUEST_LOG_DIR, SEGMENT_PREFIX, SEGMENT_SUFFIX
+
+REQUEST_LOG_BUFFER_SIZE = int(os.environ.get("REQUEST_LOG_BUFFER_SIZE", 10000))
+REQUEST_LOG_FLUSH_ROWS = int(os.environ.get("REQUEST_LOG_FLUSH_ROWS", 200))
+REQUEST_LOG_FLUSH_MS = float(os.environ.get("REQUEST_LOG_FLUSH_MS", 1000))
+REQUEST_LOG_SINK = os.environ.get("REQUEST_LOG_SINK", "database")
+REQUEST_LOG_SEGMENT_BYTES = int(
+    os.environ.get("REQUEST_LOG_SEGMENT_BYTES", 64 * 1024**2)
+)
+REQUEST_LOG_SEGMENT_SECONDS = float(os.environ.get("REQUEST_LOG_SEGMENT_SECONDS", 3600))
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseSink:
+    """
+    Writes request log batches to the request_logs table.
+    """
+
+    name = "database"
+
+    def write_batch(self, batch: List[dict]):
+        db = SessionLocal()
+        try:
+            crud.create_request_logs(db, batch)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def close(self):
+        pass
+
+
+def encode_entry(entry: dict) -> bytes:
+    """
+    Encode an entry as one JSON line. created_ts always comes first, in
+    fixed-width ISO format, so readers can filter by time on raw bytes.
+    """
+    created_ts = entry["created_ts"]
+    if isinstance(created_ts, datetime):
+        created_ts = created_ts.isoformat(timespec="microseconds")
+    rest = {k: v for k, v in entry.items() if k != "created_ts"}
+    body = json.dumps(rest, separators=(",", ":"))
+    return f'{{"created_ts":"{created_ts}",{body[1:]}\n'.encode("utf-8")
+
+
+class JsonlFileSink:
+    """
+    Appends request log batches to JSONL segment files, rotated when a
+    segment exceeds max_bytes or max_age_s. Segments are named after the
+    created_ts (epoch ms) of their first entry; entries are appended in
+    created_ts order.
+    """
+
+    name = "jsonl"
+
+    def __init__(
+        self,
+        directory: str = REQUEST_LOG_DIR,
+        max_bytes: int = REQUEST_LOG_SEGMENT_BYTES,
+        max_age_s: float = REQUEST_LOG_SEGMENT_SECONDS,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self._file = None
+        self._opened = 0.0
+
+    def _rotate(self, first_entry: dict):
+        self.close()
+        self._opened = time.time()
+        created_ts = first_entry["created_ts"]
+        if isinstance(created_ts, str):
+            created_ts = datetime.fromisoformat(created_ts)
+        start_ms = int(created_ts.replace(tzinfo=timezone.utc).timestamp() * 1000)
+        # Segments of several processes starting in the same millisecond
+        # get distinct names.
+        self._file = open(
+            self.directory
+            / f"{SEGMENT_PREFIX}{start_ms:013d}-{os.getpid()}{SEGMENT_SUFFIX}",
+            "ab",
+        )
+
+    def write_batch(self, batch: List[dict]):
+        if (
+            self._file is None
+            or self._file.tell() >= self.max_bytes
+            or time.time() - self._opened >= self.max_age_s
+        ):
+            self._rotate(batch[0])
+        self._file.write(b"".join(encode_entry(entry) for entry in batch))
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def create_sink(name: str = REQUEST_LOG_SINK):
+    """
+    Build the request log sink selected by name (REQUEST_LOG_SINK).
+    """
+    if name == "jsonl":
+        return JsonlFileSink()
+    if name == "database":
+        return DatabaseSink()
+    raise ValueError(f"Unknown request log sink: {name}")
+
+
+class RequestLogBuffer:
+    """
+    Bounded in-process queue of request log entries with a background flusher.
+    Entries that don't fit in the queue are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        sink=None,
+        max_size: int = REQUEST_LOG_BUFFER_SIZE,
+        flush_rows: int = REQUEST_LOG_FLUSH_ROWS,
+        flush_ms: float = REQUEST_LOG_FLUSH_MS,
+    ):
+        self.sink = sink or DatabaseSink()
+        self.flush_rows = max(1, flush_rows)
+        self.flush_s = flush_ms / 1000
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_size))
+        self._stop = threading.Event()
+        self._thread = None
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+
+    def enqueue(self, entry: dict) -> bool:
+        """
+        Add an entry without blocking. Returns False if it was dropped.
+        """
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def start(self):
+        """
+        Start the background flusher thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="request-log-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the flusher and write every buffered entry.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._drain()
+        self.sink.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = []
+            deadline = time.monotonic() + self.flush_s
+            while len(batch) < self.flush_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0 or self._stop.is_set():
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=min(timeout, 0.1)))
+                except queue.Empty:
+                    continue
+            if batch:
+                self._write(batch)
+
+    def _drain(self):
+        while True:
+            batch = []
+            while len(batch) < self.flush_rows:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._write(batch)
+
+    def _write(self, batch: List[dict]):
+        try:
+            self.sink.write_batch(batch)
+            self.flushed += len(batch)
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Could not write %d request log entries", len(batch))
+
+    def stats(self) -> dict:
+        """
+        Buffer counters: queued, flushed, dropped (overflow) and failed rows.
+        """
+        return {
+            "sink": self.sink.name,
+            "queued": self._queue.qsize(),
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+request_log_buffer = RequestLogBuffer(create_sink())
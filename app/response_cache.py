@@ -0,0 +1,171 @@
+"""
+Dataset-versioned cache of aggregate read results (stats, categories).
+Entries are keyed by the dataset version that every ingest bumps (see
+app.ingest.bump_dataset_version), so a new scrape invalidates them exactly;
+the TTL only bounds how long unused versions linger. The in-process LRU
+can be backed by a shared SQLite file (RESPONSE_CACHE_L2_PATH) so several
+uvicorn workers on one host compute each aggregate once per version;
+its blocking sqlite3 calls run in a worker thread, off the event loop.
+Cached values must be JSON-serializable.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 256))
+RESPONSE_CACHE_TTL_S = float(os.environ.get("RESPONSE_CACHE_TTL_S", 300))
+RESPONSE_CACHE_L2_PATH = os.environ.get("RESPONSE_CACHE_L2_PATH")
+
+_MISSING = object()
+
+
+class SharedCache:
+    """
+    Second-level cache in a local SQLite file, shared between processes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            " key TEXT PRIMARY KEY, version INTEGER NOT NULL,"
+            " value TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return _MISSING
+        return json.loads(row[0])
+
+    def set(self, key: str, version: int, value: Any, ttl_s: float):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?)",
+                (key, version, json.dumps(value), time.time() + ttl_s),
+            )
+            # Entries of older versions can never be read again.
+            self._connection.execute(
+                "DELETE FROM response_cache WHERE version < ? OR expires < ?",
+                (version, time.time()),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM response_cache")
+
+
+class ResponseCache:
+    """
+    LRU cache with TTL for values computed from one dataset version.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+        ttl_s: float = RESPONSE_CACHE_TTL_S,
+        l2_path: Optional[str] = RESPONSE_CACHE_L2_PATH,
+    ):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.l2 = SharedCache(l2_path) if l2_path else None
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(name: str, version: int, *args) -> str:
+        return json.dumps([name, version, *args], separators=(",", ":"))
+
+    async def get(self, key: str) -> Any:
+        """
+        The cached value, or _MISSING. Counts a hit or a miss.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        value = _MISSING
+        if self.l2 is not None:
+            value = await asyncio.to_thread(self.l2.get, key)
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.l2_hits += 1
+                self._store(key, value)
+        return value
+
+    async def set(self, key: str, version: int, value: Any):
+        with self._lock:
+            self._store(key, value)
+        if self.l2 is not None:
+            await asyncio.to_thread(self.l2.set, key, version, value, self.ttl_s)
+
+    def _store(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(
+        self, name: str, version: int, load: Callable[[], Awaitable[Any]], *args
+    ) -> Any:
+        """
+        Value of name(*args) at the given dataset version, loading it on a miss.
+        """
+        key = self.key(name, version, *args)
+        value = await self.get(key)
+        if value is _MISSING:
+            value = await load()
+            await self.set(key, version, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.l2 is not None:
+            self.l2.clear()
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters, hit ratio and size.
+        """
+        with self._lock:
+            lookups = self.hits + self.l2_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "shared": self.l2.path if self.l2 is not None else None,
+                "hits": self.hits,
+                "l2_hits": self.l2_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits + self.l2_hits) / lookups if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache()
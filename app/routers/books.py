@@ -2,33 +2,55 @@
 Books router: Endpoints for listing, searching, scraping, and retrieving books.
 """
 
-from fastapi import APIRouter, Depends, status, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, Query, Response, status, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import SessionLocal
-from app import crud, schemas, scraping
+from typing import List, Literal
+from app.database import get_sync_db
+from app.replicas import get_read_db
+from app import async_crud, crud, facets, schemas, search
+from app.fast_json import books_response
+from app.http_cache import conditional_get
 from app.routers.auth import get_current_user
+from app.streaming import ndjson_response
 
 api_router = APIRouter(prefix="/api/v1", tags=["books"])
 
 
-def get_db():
+@api_router.get(
+    "/books/",
+    response_model=List[schemas.BookBase],
+    dependencies=[Depends(conditional_get)],
+)
+async def list_books(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=crud.MAX_PAGE_SIZE),
+    sort: Literal["id", "price", "rating", "title"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    cursor: str = None,
+    db: AsyncSession = Depends(get_read_db),
+):
     """
-    Dependency to get a SQLAlchemy session.
+    List books with pagination, ordered by sort (then id).
+    When more books follow, the X-Next-Cursor response header holds a cursor;
+    pass it back as `cursor` (with the same sort and order) to get the next
+    page. Cursor pages cost the same at any depth, unlike skip.
     """
-    db = SessionLocal()
     try:
-        yield db
-    finally:
-        db.close()
-
-
-@api_router.get("/books/", response_model=List[schemas.BookBase])
-def list_books(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    """
-    List books with pagination.
-    """
-    return crud.get_books(db, skip=skip, limit=limit)
+        books, next_cursor = await async_crud.get_books_page(
+            db,
+            sort=sort,
+            descending=order == "desc",
+            cursor=cursor,
+            limit=limit,
+            skip=skip,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return books
 
 
 @api_router.post(
@@ -37,50 +59,161 @@ def list_books(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
     status_code=status.HTTP_201_CREATED,
 )
 def scrape_and_save_books(
-    background_tasks: BackgroundTasks,
     pages: int = 2,
-    db: Session = Depends(get_db),
+    mode: Literal["full", "incremental"] = "full",
+    db: Session = Depends(get_sync_db),
     user: str = Depends(get_current_user)
 ):
     """
-    Trigger book scraping from external site and save to database in the background.
-    Truncates the books table before scraping.
-    Returns immediately with the status.
+    Queue a scraping job, run by the worker process (python -m app.worker).
+    Full mode replaces the catalog atomically once scraping completes;
+    incremental mode only fetches new or changed books and upserts them by UPC.
+    If a job is already queued or running, that job is returned instead.
+    """
+    job, created = crud.create_scrape_job(db, pages=pages, mode=mode)
+    if not created:
+        return schemas.ScrapeResponse(
+            message="Scraping job already in progress", job_id=job.id
+        )
+    return schemas.ScrapeResponse(message="Scraping job queued", job_id=job.id)
+
+
+@api_router.get("/books/scraping/jobs/{job_id}", response_model=schemas.ScrapeJob)
+def get_scrape_job(job_id: int, db: Session = Depends(get_sync_db)):
     """
-    def run_scraping():
-        crud.truncate_books(db)
-        books = scraping.scrape_books(pages=pages)
-        crud.create_books(db, books)
-    background_tasks.add_task(run_scraping)
-    return schemas.ScrapeResponse(message="Scraping started in background")
+    Get the status and progress of a scraping job.
+    """
+    job = crud.get_scrape_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 
-@api_router.get("/books/search", response_model=List[schemas.BookBase])
-def search_books(
-    title: str = None, category: str = None, db: Session = Depends(get_db)
+@api_router.post(
+    "/books/scraping/jobs/{job_id}/cancel", response_model=schemas.ScrapeJob
+)
+def cancel_scrape_job(
+    job_id: int,
+    db: Session = Depends(get_sync_db),
+    user: str = Depends(get_current_user)
 ):
     """
-    Search books by title and/or category.
+    Cancel a queued scraping job or stop a running one.
     """
-    return crud.search_books(db, title=title, category=category)
+    job = crud.cancel_scrape_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 
-@api_router.get("/books/price-range", response_model=List[schemas.BookBase])
-def search_books_by_price(
-    min: float = None, max: float = None, db: Session = Depends(get_db)
+@api_router.get(
+    "/books/search",
+    response_model=List[schemas.BookBase],
+    dependencies=[Depends(conditional_get)],
+)
+async def search_books(
+    response: Response,
+    q: str = None,
+    title: str = None,
+    category: str = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(crud.DEFAULT_PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE),
+    stream: bool = False,
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    Search books by price range.
+    Search books by title and/or category, ordered by id.
+    With q, books whose title, category or description match the query
+    (typos tolerated) are returned most relevant first; title and category
+    then narrow the results.
+    With stream=true, all matches from skip on are streamed as NDJSON
+    and limit is ignored.
     """
-    return crud.search_books_by_price(db, min=min, max=max)
+    if q and q.strip():
+        if stream:
+            return await search.search_ndjson_response(db, q, title, category, skip)
+        books = await search.search_books(db, q, title, category, skip, limit)
+        return books_response(books, response)
+    if stream:
+        return ndjson_response(
+            db.bind, crud.search_books_statement(title, category, skip)
+        )
+    books = await async_crud.search_books(
+        db, title=title, category=category, skip=skip, limit=limit
+    )
+    return books_response(books, response)
 
 
-@api_router.get("/books/{id}", response_model=schemas.BookBase)
-def get_book(id: int, db: Session = Depends(get_db)):
+@api_router.get(
+    "/books/price-range",
+    response_model=List[schemas.BookBase],
+    dependencies=[Depends(conditional_get)],
+)
+async def search_books_by_price(
+    response: Response,
+    min: float = None,
+    max: float = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(crud.DEFAULT_PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE),
+    stream: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Search books by price range, ordered by id.
+    With stream=true, all matches from skip on are streamed as NDJSON
+    and limit is ignored.
+    """
+    if stream:
+        return ndjson_response(db.bind, crud.price_range_statement(min, max, skip))
+    books = await async_crud.search_books_by_price(
+        db, min=min, max=max, skip=skip, limit=limit
+    )
+    return books_response(books, response)
+
+
+@api_router.get(
+    "/books/query",
+    response_model=schemas.BookQueryResult,
+    dependencies=[Depends(conditional_get)],
+)
+async def query_books(
+    category: List[str] = Query(None),
+    rating: List[int] = Query(None),
+    min_price: float = None,
+    max_price: float = None,
+    available: bool = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(crud.DEFAULT_PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Filter books by any combination of category and rating (both
+    repeatable), price range and availability, ordered by price.
+    Returns the total, one page of books and facet counts per category,
+    rating, price bucket and availability.
+    """
+    return await facets.query_books(
+        db,
+        categories=category,
+        ratings=rating,
+        min_price=min_price,
+        max_price=max_price,
+        available=available,
+        skip=skip,
+        limit=limit,
+    )
+
+
+@api_router.get(
+    "/books/{id}",
+    response_model=schemas.BookBase,
+    dependencies=[Depends(conditional_get)],
+)
+async def get_book(id: int, db: AsyncSession = Depends(get_read_db)):
     """
     Get a book by its ID.
     """
-    book = crud.get_book_by_id(db, id)
+    book = await async_crud.get_book_by_id(db, id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     return book
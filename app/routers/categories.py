@@ -3,28 +3,20 @@ Categories router: Endpoint for listing book categories.
 """
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
-from app import crud
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.http_cache import conditional_get
+from app.replicas import get_read_db
+from app import async_crud
 from typing import List
 
-categories_router = APIRouter(prefix="/api/v1", tags=["categories"])
-
-
-def get_db():
-    """
-    Dependency to get a SQLAlchemy session.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+categories_router = APIRouter(
+    prefix="/api/v1", tags=["categories"], dependencies=[Depends(conditional_get)]
+)
 
 
 @categories_router.get("/categories", response_model=List[str])
-def list_categories(db: Session = Depends(get_db)):
+async def list_categories(db: AsyncSession = Depends(get_read_db)):
     """
     List all book categories.
     """
-    return crud.get_categories(db)
+    return await async_crud.get_categories(db)
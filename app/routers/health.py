@@ -3,31 +3,44 @@ Health router: Endpoint for health check of API and database.
 """
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.database import SessionLocal
+from app.database import async_engine, engine, get_db
+from app.db_pool import pool_stats
+from app.http_cache import dataset_version
+from app.replicas import read_router
+from app.request_logging import request_log_buffer
+from app.response_cache import response_cache
+from app.singleflight import singleflight
+from app.snapshot import catalog_snapshot
 
 health_router = APIRouter(prefix="/api/v1", tags=["health"])
 
 
-def get_db():
-    """
-    Dependency to get a SQLAlchemy session.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @health_router.get("/health")
-def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_db)):
     """
-    Health check endpoint for API and database connection.
+    Health check endpoint for API and database connection, including
+    request log buffer counters, connection pool metrics, read replica
+    health, the catalog snapshot state, response cache hit/miss counters
+    conditional request (ETag/304) counters and read coalescing counters.
     """
     try:
-        db.execute(text("SELECT 1"))
-        return {"status": "ok", "db": True}
+        await db.execute(text("SELECT 1"))
+        status, db_ok = "ok", True
     except Exception:
-        return {"status": "error", "db": False}
+        status, db_ok = "error", False
+    return {
+        "status": status,
+        "db": db_ok,
+        "request_log": request_log_buffer.stats(),
+        "pool": {
+            "async": pool_stats(async_engine.sync_engine),
+            "sync": pool_stats(engine),
+        },
+        "read_routing": read_router.stats(),
+        "catalog_snapshot": catalog_snapshot.stats(),
+        "response_cache": response_cache.stats(),
+        "http_cache": dataset_version.stats(),
+        "singleflight": singleflight.stats(),
+    }
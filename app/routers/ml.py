@@ -3,9 +3,10 @@ ML router: Endpoints for ML features, training data, and predictions.
 """
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
-from app import crud, schemas
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.replicas import get_read_db
+from app import async_crud, schemas
+from app.fast_json import books_response
 from app.routers.auth import get_current_user
 from typing import List
 import random
@@ -13,31 +14,20 @@ import random
 ml_router = APIRouter(prefix="/api/v1/ml", tags=["ml"])
 
 
-def get_db():
-    """
-    Dependency to get a SQLAlchemy session.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @ml_router.get("/features", response_model=List[schemas.MLBookFeatures])
-def get_features(db: Session = Depends(get_db)):
+async def get_features(db: AsyncSession = Depends(get_read_db)):
     """
     Get ML features for all books.
     """
-    books = crud.get_books(db)
+    books = await async_crud.get_books(db)
     features = [
         schemas.MLBookFeatures(
-            category=b.category,
-            rating=b.rating,
-            price_excl_tax=b.price_excl_tax,
-            price_incl_tax=b.price_incl_tax,
-            num_available=b.num_available,
-            num_reviews=b.num_reviews,
+            category=b["category"],
+            rating=b["rating"],
+            price_excl_tax=b["price_excl_tax"],
+            price_incl_tax=b["price_incl_tax"],
+            num_available=b["num_available"],
+            num_reviews=b["num_reviews"],
         )
         for b in books
     ]
@@ -45,14 +35,14 @@ def get_features(db: Session = Depends(get_db)):
 
 
 @ml_router.get("/training-data", response_model=List[schemas.BookBase])
-def get_training_data(db: Session = Depends(get_db)):
+async def get_training_data(db: AsyncSession = Depends(get_read_db)):
     """
     Get a random subset of 100 books for ML training.
     """
-    books = crud.get_books(db)
+    books = await async_crud.get_books(db)
     if len(books) > 100:
         books = random.sample(books, 100)
-    return books
+    return books_response(books)
 
 
 @ml_router.post("/predictions")
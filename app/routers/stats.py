@@ -2,46 +2,53 @@
 Stats router: Endpoints for book statistics and analytics.
 """
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
-from app import crud, schemas
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.fast_json import books_response
+from app.http_cache import conditional_get
+from app.replicas import get_read_db
+from app import async_crud, crud, schemas
+from app.streaming import ndjson_response
 from typing import List
 
-stats_router = APIRouter(prefix="/api/v1/stats", tags=["stats"])
-
-
-def get_db():
-    """
-    Dependency to get a SQLAlchemy session.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+stats_router = APIRouter(
+    prefix="/api/v1/stats",
+    tags=["stats"],
+    dependencies=[Depends(conditional_get)],
+)
 
 
 @stats_router.get("/overview", response_model=schemas.BookStatsOverview)
-def stats_overview(db: Session = Depends(get_db)):
+async def stats_overview(db: AsyncSession = Depends(get_read_db)):
     """
     Get overview statistics for books.
     """
-    return crud.get_stats_overview(db)
+    return await async_crud.get_stats_overview(db)
 
 
 @stats_router.get("/categories")
-def stats_categories(db: Session = Depends(get_db)):
+async def stats_categories(db: AsyncSession = Depends(get_read_db)):
     """
     Get statistics by book category.
     """
-    return crud.get_category_overview(db)
+    return await async_crud.get_category_overview(db)
 
 
 @stats_router.get("/top-rated", response_model=List[schemas.BookBase])
-def list_top_rated(db: Session = Depends(get_db)):
-    """
-    List books with top rating.
-    """
-    return crud.get_top_rated(db)
+async def list_top_rated(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(crud.DEFAULT_PAGE_SIZE, ge=1, le=crud.MAX_PAGE_SIZE),
+    stream: bool = False,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    List books with top rating, ordered by id.
+    With stream=true, all of them from skip on are streamed as NDJSON
+    and limit is ignored.
+    """
+    if stream:
+        return ndjson_response(db.bind, crud.top_rated_statement(skip))
+    books = await async_crud.get_top_rated(db, skip=skip, limit=limit)
+    return books_response(books, response)
 
@@ -3,7 +3,8 @@ Pydantic schemas for data validation and serialization of books and API response
 """
 
 from pydantic import BaseModel
-from typing import Dict
+from datetime import datetime
+from typing import Dict, List
 
 
 class ScrapeResponse(BaseModel):
@@ -12,6 +13,39 @@ class ScrapeResponse(BaseModel):
     """
 
     message: str
+    job_id: int | None = None
+
+
+class ScrapeJob(BaseModel):
+    """
+    Schema for the status of a scraping job.
+    """
+
+    id: int
+    status: str
+    mode: str
+    pages: int
+    pages_done: int
+    books_written: int
+    error: str | None = None
+    cancel_requested: bool
+    created_ts: datetime
+    started_ts: datetime | None = None
+    finished_ts: datetime | None = None
+    duration_s: float | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class IngestResult(BaseModel):
+    """
+    Schema for the outcome of a catalog ingest.
+    """
+
+    rows: int
+    duration_s: float
+    rows_per_sec: float
 
 
 class BookBase(BaseModel):
@@ -53,6 +87,11 @@ class BookStatsOverview(BaseModel):
     total_books: int
     average_price: float
     rating_distribution: Dict[int, int] = {"1": 10, "2": 5, "3": 20, "4": 15, "5": 50}
+    min_price: float = 0.0
+    max_price: float = 0.0
+    median_price: float = 0.0
+    p90_price: float = 0.0
+    total_stock: int = 0
 
 
 class BookStatsCategory(BaseModel):
@@ -63,6 +102,32 @@ class BookStatsCategory(BaseModel):
     category: str
     total_books: int
     average_price: float
+    median_price: float = 0.0
+    p90_price: float = 0.0
+    total_stock: int = 0
+
+
+class BookFacets(BaseModel):
+    """
+    Schema for facet counts of a book query. Each facet is counted with
+    all other filters applied.
+    """
+
+    category: Dict[str, int]
+    rating: Dict[int, int]
+    price: Dict[str, int]
+    available: Dict[str, int]
+
+
+class BookQueryResult(BaseModel):
+    """
+    Schema for a faceted book query: total matches, one page of books and
+    facet counts.
+    """
+
+    total: int
+    books: List[BookBase]
+    facets: BookFacets
 
 
 class MLBookFeatures(BaseModel):
@@ -3,101 +3,241 @@ Scraping functions to collect book data from books.toscrape.com.
 Target table: tb_books
 """
 
-import requests
-from bs4 import BeautifulSoup
-from typing import List
-import re
+import hashlib
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, NamedTuple
+from urllib.parse import urljoin
+from .page_cache import PageCache, default_cache
+from .parsers import get_parser
 from .schemas import BookCreate
+from .transport import ScraperTransport
 
-BASE_URL: str = "https://books.toscrape.com/catalogue/page-{}.html"
+SITE_URL: str = os.environ.get("SCRAPE_SITE_URL", "https://books.toscrape.com/")
+BASE_URL: str = SITE_URL + "catalogue/page-{}.html"
 
+SCRAPE_CONCURRENCY = int(os.environ.get("SCRAPE_CONCURRENCY", 8))
+SCRAPE_PER_HOST_LIMIT = int(os.environ.get("SCRAPE_PER_HOST_LIMIT", 4))
 
-def scrape_books(pages: int = 50) -> List[BookCreate]:
+
+class IncrementalScrape(NamedTuple):
+    """
+    Result of an incremental scrape: only new or changed books, plus the
+    page state to persist once those books are stored.
+    """
+
+    books: List[BookCreate]
+    state: Dict[str, dict]
+    pages_unchanged: int
+    products_skipped: int
+
+
+def iter_books(
+    pages: int = 50,
+    concurrency: int = SCRAPE_CONCURRENCY,
+    per_host_limit: int = SCRAPE_PER_HOST_LIMIT,
+    site_url: str = SITE_URL,
+    transport: ScraperTransport = None,
+    parser: str = None,
+    cache: PageCache = None,
+    replay: bool = False,
+    start_page: int = 1,
+    on_page: Callable[[int], None] = None,
+) -> Iterator[BookCreate]:
+    """
+    Scrapes books from books.toscrape.com, yielding each book as soon as it
+    is parsed. Product pages are fetched concurrently by a thread pool, with
+    at most 2 * concurrency pages in flight, so memory stays flat regardless
+    of the number of pages.
+    Args:
+            pages (int): Number of pages to collect (default=50)
+            concurrency (int): Maximum number of requests in flight (default=8)
+            per_host_limit (int): Maximum requests in flight per host (default=4)
+            site_url (str): Site root, overridable to scrape a local mirror
+            transport (ScraperTransport): Shared HTTP transport; one is
+                created (and closed) per call when omitted
+            parser (str): Parser backend name ("lxml" or "bs4"); defaults to
+                SCRAPE_PARSER
+            cache (PageCache): Raw HTML cache every fetched page is stored in;
+                defaults to the one configured by SCRAPE_CACHE_DIR
+            replay (bool): Rebuild the result from the cache only, without
+                any network I/O
+            start_page (int): First listing page to collect (default=1)
+            on_page (Callable[[int], None]): Called with the page number once
+                every book of a listing page has been yielded
+    Yields:
+            BookCreate: Extracted book data, in catalogue order
+    """
+    base_site = urljoin(site_url, "catalogue/")
+    listing_url = urljoin(site_url, "catalogue/page-{}.html")
+    page_parser = get_parser(parser)
+    cache = cache or default_cache()
+    if replay and cache is None:
+        raise ValueError("Replay mode requires a page cache (set SCRAPE_CACHE_DIR)")
+    owns_transport = transport is None and not replay
+    if owns_transport:
+        transport = ScraperTransport(
+            pool_size=concurrency, per_host_limit=per_host_limit
+        )
+
+    def fetch(url: str) -> str:
+        if replay:
+            html = cache.get(url)
+            if html is None:
+                raise LookupError(f"Page not in cache: {url}")
+            return html
+        html = transport.get_text(url)
+        if cache is not None:
+            cache.put(url, html)
+        return html
+
+    def fetch_and_parse_book(link: str) -> BookCreate:
+        return page_parser.parse_book(fetch(base_site + link), site_url)
+
+    def drain_one(pending: deque) -> Iterator[BookCreate]:
+        # Entries are futures, or page numbers marking the end of a page.
+        entry = pending.popleft()
+        if isinstance(entry, int):
+            if on_page is not None:
+                on_page(entry)
+        else:
+            yield entry.result()
+
+    window = 2 * max(1, concurrency)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            page_numbers = range(start_page, start_page + pages)
+            pending = deque()
+            next_listing = None
+            if page_numbers:
+                next_listing = executor.submit(fetch, listing_url.format(start_page))
+            for page in page_numbers:
+                listing_html = next_listing.result()
+                if page + 1 in page_numbers:
+                    next_listing = executor.submit(fetch, listing_url.format(page + 1))
+                for link in page_parser.parse_listing(listing_html):
+                    pending.append(executor.submit(fetch_and_parse_book, link))
+                    while len(pending) >= window:
+                        yield from drain_one(pending)
+                pending.append(page)
+            while pending:
+                yield from drain_one(pending)
+    finally:
+        if cache is not None:
+            cache.flush()
+        if owns_transport:
+            transport.close()
+
+
+def scrape_books(pages: int = 50, **kwargs) -> List[BookCreate]:
     """
     Scrapes books from books.toscrape.com, collecting all relevant information.
     Args:
             pages (int): Number of pages to collect (default=50)
+            **kwargs: Fetch options, see iter_books
     Returns:
-            List[BookCreate]: List of extracted book data
+            List[BookCreate]: List of extracted book data, in catalogue order
     """
-    books = []
-    base_site = "https://books.toscrape.com/catalogue/"
-
-    for page in range(1, pages + 1):
-        url = BASE_URL.format(page)
-        resp = requests.get(url)
-        resp.raise_for_status()
-
-        soup = BeautifulSoup(resp.text, "html.parser")
-        ls_articles = soup.find_all("article", class_="product_pod")
-        ls_links = [link.h3.a["href"] for link in ls_articles]
-
-        for link in ls_links:
-            book_resp = requests.get(base_site + link)
-            book_resp.raise_for_status()
-            book_soup = BeautifulSoup(book_resp.text, "html.parser")
-
-            # Extract book attributes
-            b_title = book_soup.find("h1").get_text(strip=True)
-
-            breadcrumbs = book_soup.find("ul", class_="breadcrumb").find_all("li")
-            b_category = breadcrumbs[-2].get_text(strip=True)
-
-            class_rating = book_soup.find("p", class_="star-rating")["class"]
-            ratings_dict = {"One": 1, "Two": 2, "Three": 3, "Four": 4, "Five": 5}
-            b_rating = ratings_dict[class_rating[1]]
-
-            desc_header = book_soup.find("div", id="product_description")
-            if desc_header:
-                desc_p = desc_header.find_next_sibling("p")
-                b_description = desc_p.get_text(strip=True) if desc_p else ""
-            else:
-                b_description = ""
-
-            img_tag = book_soup.find("div", class_="item active").img
-            b_img_src = "https://books.toscrape.com/" + img_tag["src"]
-
-            info_table = book_soup.find("table", class_="table table-striped")
-            for row in info_table.find_all("tr"):
-                if row.th.get_text(strip=True) == "UPC":
-                    b_upc = row.td.get_text(strip=True)
-                elif row.th.get_text(strip=True) == "Product Type":
-                    b_product_type = row.td.get_text(strip=True)
-                elif row.th.get_text(strip=True) == "Price (excl. tax)":
-                    b_price_excl_tax = float(
-                        re.sub(r"[^0-9.]", "", row.td.get_text(strip=True))
-                    )
-                elif row.th.get_text(strip=True) == "Price (incl. tax)":
-                    b_price_incl_tax = float(
-                        re.sub(r"[^0-9.]", "", row.td.get_text(strip=True))
-                    )
-                elif row.th.get_text(strip=True) == "Tax":
-                    b_tax = float(re.sub(r"[^0-9.]", "", row.td.get_text(strip=True)))
-                elif row.th.get_text(strip=True) == "Availability":
-                    availability_text = row.td.get_text(strip=True)
-                    b_num_available = (
-                        int(re.search(r"\d+", availability_text).group())
-                        if re.search(r"\d+", availability_text)
-                        else 0
-                    )
-                elif row.th.get_text(strip=True) == "Number of reviews":
-                    b_num_reviews = int(row.td.get_text(strip=True))
-
-            books.append(
-                BookCreate(
-                    title=b_title,
-                    category=b_category,
-                    rating=b_rating,
-                    description=b_description,
-                    image_url=b_img_src,
-                    upc=b_upc,
-                    product_type=b_product_type,
-                    price_excl_tax=b_price_excl_tax,
-                    price_incl_tax=b_price_incl_tax,
-                    tax=b_tax,
-                    num_available=b_num_available,
-                    num_reviews=b_num_reviews,
-                )
+    return list(iter_books(pages=pages, **kwargs))
+
+
+def scrape_books_incremental(
+    pages: int = 50,
+    state: Dict[str, dict] = None,
+    concurrency: int = SCRAPE_CONCURRENCY,
+    per_host_limit: int = SCRAPE_PER_HOST_LIMIT,
+    site_url: str = SITE_URL,
+    transport: ScraperTransport = None,
+    parser: str = None,
+    cache: PageCache = None,
+    start_page: int = 1,
+) -> IncrementalScrape:
+    """
+    Scrapes only what changed since the previous run.
+    Listing pages are fetched with conditional GETs (ETag/Last-Modified) and
+    compared by content hash; product pages are fetched only when their
+    listing entry is new or differs from the previous run.
+    Args:
+            pages (int): Number of pages to check (default=50)
+            state (Dict[str, dict]): Page state from the previous run, keyed
+                by URL ({"etag", "last_modified", "content_hash"})
+            start_page (int): First listing page to check (default=1)
+            Other arguments as in iter_books.
+    Returns:
+            IncrementalScrape: Changed books and the state entries to update
+    """
+    state = state or {}
+    base_site = urljoin(site_url, "catalogue/")
+    listing_url = urljoin(site_url, "catalogue/page-{}.html")
+    page_parser = get_parser(parser)
+    cache = cache or default_cache()
+    owns_transport = transport is None
+    if owns_transport:
+        transport = ScraperTransport(
+            pool_size=concurrency, per_host_limit=per_host_limit
+        )
+
+    def fetch_listing(page: int):
+        url = listing_url.format(page)
+        known = state.get(url, {})
+        resp = transport.get_conditional(
+            url, known.get("etag"), known.get("last_modified")
+        )
+        if resp.status_code == 304:
+            return url, None, None
+        html = resp.text
+        entry = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "content_hash": hashlib.sha256(html.encode("utf-8")).hexdigest(),
+        }
+        if cache is not None:
+            cache.put(url, html)
+        if entry["content_hash"] == known.get("content_hash"):
+            return url, entry, None
+        return url, entry, html
+
+    def fetch_and_parse_book(link: str) -> BookCreate:
+        html = transport.get_text(link)
+        if cache is not None:
+            cache.put(link, html)
+        return page_parser.parse_book(html, site_url)
+
+    updates: Dict[str, dict] = {}
+    pages_unchanged = 0
+    to_fetch = []
+    skipped = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            for url, entry, html in executor.map(
+                fetch_listing, range(start_page, start_page + pages)
+            ):
+                if entry is not None:
+                    updates[url] = entry
+                if html is None:
+                    pages_unchanged += 1
+                    continue
+                for link, fingerprint in page_parser.parse_listing_items(html):
+                    product_url = base_site + link
+                    if state.get(product_url, {}).get("content_hash") == fingerprint:
+                        skipped += 1
+                    else:
+                        to_fetch.append((product_url, fingerprint))
+
+            books = list(
+                executor.map(fetch_and_parse_book, [url for url, _ in to_fetch])
             )
+    finally:
+        if cache is not None:
+            cache.flush()
+        if owns_transport:
+            transport.close()
 
-    return books
+    for product_url, fingerprint in to_fetch:
+        updates[product_url] = {
+            "etag": None,
+            "last_modified": None,
+            "content_hash": fingerprint,
+        }
+    return IncrementalScrape(books, updates, pages_unchanged, skipped)
@@ -0,0 +1,272 @@
+"""
+Relevance-ranked, typo-tolerant book search over title, category and
+description.
+On PostgreSQL, queries use a GIN full-text index (tsvector) ranked with
+ts_rank, plus a pg_trgm index on title for fuzzy title matches. Elsewhere
+(SQLite, local runs), an in-process inverted index is built from tb_books
+(in a worker thread) and rebuilt whenever the dataset version changes;
+matching books are then fetched SEARCH_ID_CHUNK ids at a time and put in
+rank order in Python, keeping every query under SQLite's bound-parameter
+limit however many books match.
+"""
+
+import asyncio
+import math
+import os
+import re
+from collections import defaultdict
+from difflib import get_close_matches
+from typing import AsyncIterator, Dict, Iterable, List, Tuple
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, case, false, func, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from app import async_crud, crud, models
+from app.database import AsyncSessionLocal
+from app.fast_json import BOOK_COLUMNS, BOOK_FIELDS, dumps, fetch_books
+from app.streaming import STREAM_BATCH_SIZE, ndjson_response
+
+SEARCH_ID_CHUNK = int(os.environ.get("SEARCH_ID_CHUNK", 500))
+
+# Must match the expression of the ix_tb_books_fts index exactly.
+SEARCH_DOCUMENT = (
+    "to_tsvector('english', title || ' ' || category || ' ' || description)"
+)
+
+POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_tb_books_fts "
+    f"ON tb_books USING gin ({SEARCH_DOCUMENT})",
+    "CREATE INDEX IF NOT EXISTS ix_tb_books_title_trgm "
+    "ON tb_books USING gin (title gin_trgm_ops)",
+]
+
+# Field weights of the fallback index
+FIELD_WEIGHTS = {"title": 3.0, "category": 2.0, "description": 1.0}
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def create_search_indexes(connection):
+    """
+    Create the PostgreSQL full-text and trigram indexes (no-op elsewhere).
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    for statement in POSTGRES_SEARCH_DDL:
+        connection.execute(text(statement))
+
+
+def tokenize(value: str) -> List[str]:
+    return TOKEN_RE.findall(value.lower())
+
+
+class InvertedIndex:
+    """
+    Token -> {book id: weighted term frequency} postings for the catalog.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, str, str, str]] = (), version=None):
+        self.version = version
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.documents = 0
+        for book_id, title, category, description in rows:
+            self.documents += 1
+            for field, value in (
+                ("title", title),
+                ("category", category),
+                ("description", description),
+            ):
+                weight = FIELD_WEIGHTS[field]
+                for token in tokenize(value or ""):
+                    postings = self.postings[token]
+                    postings[book_id] = postings.get(book_id, 0.0) + weight
+        self.vocabulary = sorted(self.postings)
+
+    def _expand(self, token: str) -> List[str]:
+        """
+        The token itself if indexed, otherwise indexed tokens it prefixes,
+        otherwise close spellings (typo tolerance).
+        """
+        if token in self.postings:
+            return [token]
+        prefixed = [term for term in self.vocabulary if term.startswith(token)]
+        if prefixed and len(token) >= 3:
+            return prefixed[:20]
+        return get_close_matches(token, self.vocabulary, n=3, cutoff=0.8)
+
+    def search(self, query: str) -> List[int]:
+        """
+        Ids of books matching every query term, best matches first.
+        Scores are term frequency x inverse document frequency.
+        """
+        scores = None
+        for token in tokenize(query):
+            token_scores: Dict[int, float] = {}
+            for term in self._expand(token):
+                postings = self.postings[term]
+                idf = math.log(1 + self.documents / len(postings))
+                for book_id, tf in postings.items():
+                    token_scores[book_id] = token_scores.get(book_id, 0.0) + tf * idf
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    book_id: score + token_scores[book_id]
+                    for book_id, score in scores.items()
+                    if book_id in token_scores
+                }
+            if not scores:
+                return []
+        if scores is None:
+            return []
+        return sorted(scores, key=lambda book_id: (-scores[book_id], book_id))
+
+
+_index = InvertedIndex()
+_index_lock = asyncio.Lock()
+
+
+async def _fallback_index(db: AsyncSession) -> InvertedIndex:
+    """
+    The in-process index, rebuilt if the dataset version moved on.
+    Concurrent requests wait for a single rebuild, which tokenizes in a
+    worker thread so the event loop keeps serving other requests.
+    """
+    global _index
+    version = await async_crud.get_dataset_version(db)
+    if _index.version == version:
+        return _index
+    async with _index_lock:
+        if _index.version != version:
+            rows = (
+                await db.execute(
+                    select(
+                        models.Book.id,
+                        models.Book.title,
+                        models.Book.category,
+                        models.Book.description,
+                    )
+                )
+            ).all()
+            _index = await asyncio.to_thread(InvertedIndex, rows, version)
+    return _index
+
+
+def _filters(title: str = None, category: str = None):
+    # The substring filters of crud.search_books, or None
+    return crud.search_books_statement(title, category).whereclause
+
+
+def postgres_search_statement(
+    q: str, title: str = None, category: str = None, skip: int = 0, limit: int = None
+) -> Select:
+    """
+    Full-text (websearch syntax) or fuzzy title matches, ranked.
+    """
+    document = literal_column(SEARCH_DOCUMENT)
+    query = func.websearch_to_tsquery(literal_column("'english'"), q)
+    rank = func.ts_rank(document, query) + func.similarity(models.Book.title, q)
+    stmt = select(models.Book).where(
+        document.op("@@")(query) | models.Book.title.op("%")(q)
+    )
+    filters = _filters(title, category)
+    if filters is not None:
+        stmt = stmt.where(filters)
+    return stmt.order_by(rank.desc(), models.Book.id).offset(skip or None).limit(limit)
+
+
+def ranked_statement(book_ids: List[int]) -> Select:
+    """
+    Books with the given ids, in the given order.
+    """
+    if not book_ids:
+        return select(models.Book).where(false())
+    position = case(
+        {book_id: index for index, book_id in enumerate(book_ids)},
+        value=models.Book.id,
+    )
+    return select(models.Book).where(models.Book.id.in_(book_ids)).order_by(position)
+
+
+async def fallback_search_ids(
+    db: AsyncSession, q: str, title: str = None, category: str = None
+) -> List[int]:
+    """
+    Ids of all books matching q in the in-process index, most relevant first.
+    title and category, when given, narrow the results (substring match).
+    """
+    book_ids = (await _fallback_index(db)).search(q)
+    filters = _filters(title, category)
+    if filters is not None and book_ids:
+        allowed = set(await db.scalars(select(models.Book.id).where(filters)))
+        book_ids = [book_id for book_id in book_ids if book_id in allowed]
+    return book_ids
+
+
+async def fetch_ranked(db: AsyncSession, book_ids: List[int]) -> List[dict]:
+    """
+    Books with the given ids as dicts, in the given order, fetched
+    SEARCH_ID_CHUNK ids at a time.
+    """
+    books = {}
+    for start in range(0, len(book_ids), SEARCH_ID_CHUNK):
+        chunk = book_ids[start : start + SEARCH_ID_CHUNK]
+        rows = await db.execute(select(*BOOK_COLUMNS).where(models.Book.id.in_(chunk)))
+        for row in rows:
+            book = dict(zip(BOOK_FIELDS, row))
+            books[book["id"]] = book
+    return [books[book_id] for book_id in book_ids if book_id in books]
+
+
+async def iter_ranked_ndjson(
+    engine: AsyncEngine, book_ids: List[int]
+) -> AsyncIterator[bytes]:
+    """
+    Yield the books with the given ids, in order, as NDJSON chunks of
+    STREAM_BATCH_SIZE books (see app.streaming).
+    """
+    async with AsyncSessionLocal(bind=engine) as db:
+        for start in range(0, len(book_ids), STREAM_BATCH_SIZE):
+            books = await fetch_ranked(db, book_ids[start : start + STREAM_BATCH_SIZE])
+            yield b"".join(dumps(book) + b"\n" for book in books)
+
+
+async def search_books(
+    db: AsyncSession,
+    q: str,
+    title: str = None,
+    category: str = None,
+    skip: int = 0,
+    limit: int = None,
+) -> List[dict]:
+    """
+    One page of books matching q, most relevant first.
+    """
+    if db.bind.dialect.name == "postgresql":
+        stmt = postgres_search_statement(q, title, category, skip, limit)
+        return await fetch_books(db, stmt)
+    book_ids = await fallback_search_ids(db, q, title, category)
+    end = None if limit is None else skip + limit
+    return await fetch_ranked(db, book_ids[skip:end])
+
+
+async def search_ndjson_response(
+    db: AsyncSession,
+    q: str,
+    title: str = None,
+    category: str = None,
+    skip: int = 0,
+) -> StreamingResponse:
+    """
+    Streaming NDJSON response of all books matching q from skip on, most
+    relevant first.
+    """
+    if db.bind.dialect.name == "postgresql":
+        return ndjson_response(
+            db.bind, postgres_search_statement(q, title, category, skip)
+        )
+    book_ids = await fallback_search_ids(db, q, title, category)
+    return StreamingResponse(
+        iter_ranked_ndjson(db.bind, book_ids[skip:]),
+        media_type="application/x-ndjson",
+    )
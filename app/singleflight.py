@@ -0,0 +1,97 @@
+"""
+Request coalescing ("singleflight") for async reads.
+Concurrent calls of a decorated function on the same engine with the same
+arguments share one execution: the first caller (the leader) runs the query
+with its own session and every caller arriving while it is in flight awaits
+the same result. Followers never touch their own session, so a thundering
+herd after an ingest costs one query per distinct call and engine. Results
+are shared objects and must not be mutated by callers.
+"""
+
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    In-flight calls by key, with coalescing counters.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Result of load(), shared with concurrent calls of the same key.
+        """
+        self.calls += 1
+        while key in self._calls:
+            future = self._calls[key]
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled (e.g. its client went away):
+                # take over, or join whoever took over first.
+                continue
+            self.coalesced += 1
+            return result
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.executed += 1
+        try:
+            result = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark it retrieved: there may be no follower to do it.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        """
+        Calls, executions, coalesced calls and the coalescing ratio.
+        """
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+            "coalescing_ratio": self.coalesced / self.calls if self.calls else 0.0,
+        }
+
+
+singleflight = SingleFlight()
+
+
+def coalesce(function):
+    """
+    Decorator for async reads taking a session first: concurrent calls
+    on the same database with equal remaining (hashable) arguments share
+    one execution. Sessions bound to different engines (the primary and
+    each replica) never share results, as a replica may lag the primary.
+    """
+
+    @functools.wraps(function)
+    async def wrapper(db, *args, **kwargs):
+        key = (
+            function.__qualname__,
+            str(db.bind.url),
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+        return await singleflight.do(key, lambda: function(db, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,273 @@
+"""
+In-memory columnar snapshot of the catalog (tb_books).
+When CATALOG_SNAPSHOT is enabled, the catalog is loaded into compact
+column arrays (array module, interned category strings) and read
+endpoints answer id lookups, price ranges (bisection over a price-sorted
+index), top-rated and stats from memory without touching the database.
+A background thread polls the dataset version every
+CATALOG_SNAPSHOT_REFRESH_S seconds (default 5) and swaps in a new snapshot
+when it changed, so reads may lag an ingest by up to that interval.
+"""
+
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Optional
+from sqlalchemy import select
+from app.database import SessionLocal
+from app import crud, models, schemas
+from app.aggregates import percentile
+
+CATALOG_SNAPSHOT = os.environ.get("CATALOG_SNAPSHOT", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+CATALOG_SNAPSHOT_REFRESH_S = float(os.environ.get("CATALOG_SNAPSHOT_REFRESH_S", 5))
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSnapshot:
+    """
+    Immutable column store of all books, ordered by id.
+    """
+
+    def __init__(self, books: List[models.Book], version: int):
+        started = time.perf_counter()
+        self.version = version
+        books = sorted(books, key=lambda book: book.id)
+        self.ids = array("q", (book.id for book in books))
+        self.price_excl_tax = array("d", (book.price_excl_tax for book in books))
+        self.price_incl_tax = array("d", (book.price_incl_tax for book in books))
+        self.tax = array("d", (book.tax for book in books))
+        self.rating = array("b", (book.rating for book in books))
+        self.num_available = array("q", (book.num_available for book in books))
+        self.num_reviews = array("q", (book.num_reviews for book in books))
+        # Categories are stored once; rows hold their code.
+        self.category_names: List[str] = []
+        codes = {}
+        self.category = array("H")
+        for book in books:
+            if book.category not in codes:
+                codes[book.category] = len(self.category_names)
+                self.category_names.append(sys.intern(book.category))
+            self.category.append(codes[book.category])
+        self.title = [book.title for book in books]
+        self.description = [book.description for book in books]
+        self.upc = [book.upc for book in books]
+        self.product_type = [sys.intern(book.product_type) for book in books]
+        self.image_url = [book.image_url for book in books]
+
+        # Row positions sorted by (price, id), and their prices, for bisection
+        self.by_price = array(
+            "q", sorted(range(len(books)), key=lambda row: self.price_incl_tax[row])
+        )
+        self.sorted_prices = array(
+            "d", (self.price_incl_tax[row] for row in self.by_price)
+        )
+        self.rows_by_rating = {
+            rating: array(
+                "q", (row for row in range(len(books)) if self.rating[row] == rating)
+            )
+            for rating in set(self.rating)
+        }
+        self._aggregate()
+        self.build_ms = (time.perf_counter() - started) * 1000
+        self.built_at = time.time()
+
+    def _aggregate(self):
+        # Same figures as app.aggregates computes at ingest time
+        total = len(self.ids)
+        self.overview = schemas.BookStatsOverview(
+            total_books=total,
+            average_price=math.fsum(self.price_incl_tax) / total if total else 0.0,
+            rating_distribution={
+                rating: len(rows)
+                for rating, rows in sorted(self.rows_by_rating.items())
+            },
+            min_price=self.sorted_prices[0] if total else 0.0,
+            max_price=self.sorted_prices[-1] if total else 0.0,
+            median_price=percentile(self.sorted_prices, 0.5),
+            p90_price=percentile(self.sorted_prices, 0.9),
+            total_stock=sum(self.num_available),
+        )
+        prices = [[] for _ in self.category_names]
+        stock = [0] * len(self.category_names)
+        for row in self.by_price:
+            prices[self.category[row]].append(self.price_incl_tax[row])
+            stock[self.category[row]] += self.num_available[row]
+        self.category_stats = crud.build_category_stats(
+            sorted(
+                (
+                    name,
+                    len(prices[code]),
+                    math.fsum(prices[code]) / len(prices[code]),
+                    percentile(prices[code], 0.5),
+                    percentile(prices[code], 0.9),
+                    stock[code],
+                )
+                for code, name in enumerate(self.category_names)
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row(self, row: int) -> dict:
+        """
+        Book fields of one row, as returned by the API.
+        """
+        return {
+            "id": self.ids[row],
+            "title": self.title[row],
+            "category": self.category_names[self.category[row]],
+            "rating": self.rating[row],
+            "description": self.description[row],
+            "upc": self.upc[row],
+            "product_type": self.product_type[row],
+            "price_excl_tax": self.price_excl_tax[row],
+            "price_incl_tax": self.price_incl_tax[row],
+            "tax": self.tax[row],
+            "num_available": self.num_available[row],
+            "num_reviews": self.num_reviews[row],
+            "image_url": self.image_url[row],
+        }
+
+    def _page(self, rows, skip: int, limit: Optional[int]) -> List[dict]:
+        end = None if limit is None else skip + limit
+        return [self.row(row) for row in rows[skip:end]]
+
+    def get(self, book_id: int) -> Optional[dict]:
+        row = bisect_left(self.ids, book_id)
+        if row < len(self.ids) and self.ids[row] == book_id:
+            return self.row(row)
+        return None
+
+    def price_range(
+        self, min: float = None, max: float = None, skip: int = 0, limit: int = None
+    ) -> List[dict]:
+        """
+        Books priced within [min, max], ordered by id (like the database).
+        Falsy bounds are ignored, as in crud.price_range_statement.
+        """
+        start = bisect_left(self.sorted_prices, min) if min else 0
+        end = bisect_right(self.sorted_prices, max) if max else len(self.sorted_prices)
+        rows = sorted(self.by_price[start:end])
+        return self._page(rows, skip, limit)
+
+    def top_rated(self, skip: int = 0, limit: int = None) -> List[dict]:
+        return self._page(self.rows_by_rating.get(5, array("q")), skip, limit)
+
+    def categories(self) -> List[str]:
+        return sorted(self.category_names)
+
+
+def load_snapshot() -> CatalogSnapshot:
+    """
+    Build a snapshot of the current catalog from the primary database.
+    """
+    db = SessionLocal()
+    try:
+        # Version first: rows read afterwards are at least as new, so a
+        # concurrent ingest can only cause an extra rebuild later.
+        version = crud.get_dataset_version(db)
+        books = db.scalars(select(models.Book)).all()
+        return CatalogSnapshot(books, version)
+    finally:
+        db.close()
+
+
+class SnapshotManager:
+    """
+    Holds the current snapshot and refreshes it in a background thread.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = CATALOG_SNAPSHOT,
+        refresh_s: float = CATALOG_SNAPSHOT_REFRESH_S,
+    ):
+        self.enabled = enabled
+        self.refresh_s = refresh_s
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self.swaps = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """
+        The current snapshot, or None if disabled or not loaded yet.
+        """
+        return self.snapshot
+
+    def refresh(self) -> bool:
+        """
+        Rebuild the snapshot if the dataset version changed. Returns True
+        if a new snapshot was swapped in.
+        """
+        db = SessionLocal()
+        try:
+            version = crud.get_dataset_version(db)
+        finally:
+            db.close()
+        if self.snapshot is not None and self.snapshot.version == version:
+            return False
+        # Readers keep using the old snapshot until this single assignment.
+        self.snapshot = load_snapshot()
+        self.swaps += 1
+        return True
+
+    def start(self):
+        """
+        Load the first snapshot and start the refresher thread.
+        """
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Could not load the catalog snapshot")
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="catalog-snapshot-refresher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_s):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Could not refresh the catalog snapshot")
+
+    def stats(self) -> dict:
+        """
+        Snapshot state: version, rows, build time, age and swap count.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            return {"enabled": self.enabled, "loaded": False}
+        return {
+            "enabled": self.enabled,
+            "loaded": True,
+            "version": snapshot.version,
+            "rows": len(snapshot),
+            "build_ms": snapshot.build_ms,
+            "age_s": time.time() - snapshot.built_at,
+            "swaps": self.swaps,
+        }
+
+
+catalog_snapshot = SnapshotManager()
@@ -0,0 +1,40 @@
+"""
+NDJSON streaming of book query results.
+Rows are fetched through a server-side cursor in batches of
+STREAM_BATCH_SIZE (yield_per) and written to the client batch by batch,
+so memory per request stays constant however many rows match. Rows are
+encoded with the fast JSON path (see app.fast_json).
+"""
+
+import os
+from typing import AsyncIterator
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.database import AsyncSessionLocal
+from app.fast_json import BOOK_FIELDS, book_rows_statement, dumps
+
+STREAM_BATCH_SIZE = int(os.environ.get("STREAM_BATCH_SIZE", 500))
+
+
+async def iter_ndjson(engine: AsyncEngine, stmt: Select) -> AsyncIterator[bytes]:
+    """
+    Yield the books selected by stmt as NDJSON chunks, one per batch.
+    The generator opens its own session: request-scoped sessions are
+    closed before a streaming response body runs.
+    """
+    async with AsyncSessionLocal(bind=engine) as db:
+        result = await db.stream(
+            book_rows_statement(stmt).execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for batch in result.partitions():
+            yield b"".join(dumps(dict(zip(BOOK_FIELDS, row))) + b"\n" for row in batch)
+
+
+def ndjson_response(engine: AsyncEngine, stmt: Select) -> StreamingResponse:
+    """
+    Streaming NDJSON response for a books statement.
+    """
+    return StreamingResponse(
+        iter_ndjson(engine, stmt), media_type="application/x-ndjson"
+    )
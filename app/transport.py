@@ -0,0 +1,259 @@
+"""
+HTTP transport for the scraper.
+Provides keep-alive connection pooling, bounded retries with jittered
+exponential backoff, a per-host politeness cap and an adaptive rate limiter.
+"""
+
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict
+from urllib.parse import urlsplit
+from urllib3.connection import HTTPConnection, HTTPSConnection
+
+SCRAPE_MAX_RETRIES = int(os.environ.get("SCRAPE_MAX_RETRIES", 4))
+SCRAPE_TIMEOUT_S = float(os.environ.get("SCRAPE_TIMEOUT_S", 30))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AdaptiveRateLimiter:
+    """
+    Spaces requests to a host. The interval grows multiplicatively on
+    429/5xx responses and shrinks back gradually on healthy ones.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 0.0,
+        max_interval: float = 10.0,
+        step: float = 0.25,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.step = step
+        self.interval = min_interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """
+        Block until the caller may send its next request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def on_success(self):
+        """
+        Speed up after a healthy response.
+        """
+        with self._lock:
+            self.interval = max(self.min_interval, self.interval * 0.8 - 0.01)
+
+    def on_throttle(self):
+        """
+        Slow down after a 429/5xx response.
+        """
+        with self._lock:
+            self.interval = min(self.max_interval, max(self.step, self.interval * 2))
+
+
+class CountingAdapter(HTTPAdapter):
+    """
+    HTTPAdapter counting the requests it sends and the connections its pools
+    open; every other request went over an already open (kept-alive)
+    connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.requests_sent = 0
+        self.connections_opened = 0
+        self._count_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def _opened(self):
+        with self._count_lock:
+            self.connections_opened += 1
+
+    def _counting(self, connection_cls):
+        adapter = self
+
+        class CountingConnection(connection_cls):
+            def connect(self):
+                adapter._opened()
+                super().connect()
+
+        return CountingConnection
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        # Pools of this adapter get connection classes that report to it.
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: type(
+                pool_cls.__name__,
+                (pool_cls,),
+                {
+                    "ConnectionCls": self._counting(
+                        HTTPSConnection if scheme == "https" else HTTPConnection
+                    )
+                },
+            )
+            for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def send(self, request, *args, **kwargs):
+        with self._count_lock:
+            self.requests_sent += 1
+        return super().send(request, *args, **kwargs)
+
+    @property
+    def reused_connections(self) -> int:
+        """
+        Number of requests served over an already open connection.
+        """
+        with self._count_lock:
+            return max(0, self.requests_sent - self.connections_opened)
+
+
+def _wire_bytes(resp: requests.Response) -> int:
+    """
+    Body bytes received on the wire, before content decoding (gzip etc.).
+    """
+    body = resp.content
+    tell = getattr(resp.raw, "tell", None)
+    return tell() if tell else len(body)
+
+
+class ScraperTransport:
+    """
+    Thread-safe HTTP client shared by all scraper workers.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 8,
+        per_host_limit: int = 4,
+        max_retries: int = SCRAPE_MAX_RETRIES,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = SCRAPE_TIMEOUT_S,
+    ):
+        self.per_host_limit = max(1, per_host_limit)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self._adapter = CountingAdapter(
+            pool_connections=4, pool_maxsize=max(1, pool_size), pool_block=True
+        )
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._limiters: Dict[str, AdaptiveRateLimiter] = {}
+        self.requests = 0
+        self.retries = 0
+        self.bytes_fetched = 0
+
+    def _host(self, url: str):
+        """
+        Return the (semaphore, rate limiter) pair for the host of a URL.
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+                self._limiters[host] = AdaptiveRateLimiter()
+            return self._slots[host], self._limiters[host]
+
+    def _backoff(self, attempt: int, retry_after: str = None) -> float:
+        """
+        Full-jitter exponential backoff, honouring a numeric Retry-After.
+        """
+        if retry_after and retry_after.isdigit():
+            return min(self.backoff_max, float(retry_after))
+        cap = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return random.uniform(0, cap)
+
+    def get(self, url: str, headers: dict = None) -> requests.Response:
+        """
+        GET a URL, retrying connection errors and 429/5xx responses.
+        Raises requests.HTTPError once retries are exhausted.
+        """
+        slot, limiter = self._host(url)
+        attempt = 0
+        while True:
+            limiter.wait()
+            try:
+                with slot:
+                    resp = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                limiter.on_throttle()
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                with self._lock:
+                    self.requests += 1
+                    self.bytes_fetched += _wire_bytes(resp)
+                if resp.status_code not in RETRY_STATUS_CODES:
+                    limiter.on_success()
+                    resp.raise_for_status()
+                    return resp
+                limiter.on_throttle()
+                if attempt >= self.max_retries:
+                    resp.raise_for_status()
+                delay = self._backoff(attempt, resp.headers.get("Retry-After"))
+            with self._lock:
+                self.retries += 1
+            attempt += 1
+            time.sleep(delay)
+
+    def get_text(self, url: str) -> str:
+        """
+        GET a URL and return the decoded body.
+        """
+        return self.get(url).text
+
+    def get_conditional(
+        self, url: str, etag: str = None, last_modified: str = None
+    ) -> requests.Response:
+        """
+        Conditional GET: the response is a 304 with an empty body when the
+        page still matches the given validators.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return self.get(url, headers=headers)
+
+    def stats(self) -> dict:
+        """
+        Transport counters: requests, retries, connections opened and
+        reused, and body bytes received on the wire.
+        """
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "connections_opened": self._adapter.connections_opened,
+            "reused_connections": self._adapter.reused_connections,
+            "bytes_fetched": self.bytes_fetched,
+        }
+
+    def close(self):
+        """
+        Close all pooled connections.
+        """
+        self.session.close()
@@ -0,0 +1,263 @@
+"""
+Scraping worker: runs queued scraping jobs outside the web process.
+Jobs are split into page-range leases; any number of workers (processes
+or hosts) pull leases from the database, and a crashed worker's lease is
+reclaimed once it expires.
+
+Start with `python -m app.worker [--processes N]` (see Procfile). On
+SIGTERM or SIGINT a worker stops at the next batch boundary, hands its
+current lease back and exits; with --processes N the parent forwards the
+signal to every child and waits for them.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from typing import List
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, engine
+from app import crud, models, scraping, schemas
+from app.migrations import migrate
+from app.pipeline import run_pipeline
+from app.transport import ScraperTransport
+
+WORKER_POLL_S = float(os.environ.get("WORKER_POLL_S", 2))
+WORKER_PROCESSES = int(os.environ.get("WORKER_PROCESSES", 1))
+SCRAPE_LEASE_TTL_S = float(os.environ.get("SCRAPE_LEASE_TTL_S", 300))
+
+logger = logging.getLogger(__name__)
+
+# Set on SIGTERM/SIGINT: the worker stops at the next batch boundary, so a
+# database write in progress (e.g. a job's final swap) is never interrupted.
+stopping = threading.Event()
+
+
+class LeaseLost(Exception):
+    """
+    Raised inside a running lease when it expired and was reclaimed, or
+    when its job was cancelled.
+    """
+
+
+class WorkerStopping(Exception):
+    """
+    Raised inside a running lease when the worker was asked to stop.
+    """
+
+
+class LeaseHeartbeat:
+    """
+    Renews a lease every ttl_s / 3 from a background thread with its own
+    session, however long the scrape blocks between writes. check() raises
+    LeaseLost in the worker once a renewal failed.
+    """
+
+    def __init__(self, lease: models.ScrapeLease, ttl_s: float):
+        # A detached copy: the worker's session is not shared across threads.
+        self.lease = models.ScrapeLease(
+            id=lease.id, job_id=lease.job_id, claim_token=lease.claim_token
+        )
+        self.ttl_s = ttl_s
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"lease-heartbeat-{lease.id}", daemon=True
+        )
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        db = SessionLocal()
+        try:
+            while not self._stop.wait(self.ttl_s / 3):
+                try:
+                    if not crud.renew_scrape_lease(db, self.lease, self.ttl_s):
+                        self.lost.set()
+                        return
+                except Exception:
+                    # Transient database error: the next beat retries
+                    # before the lease expires.
+                    logger.exception("Could not renew lease %s", self.lease.id)
+                    db.rollback()
+        finally:
+            db.close()
+
+    def check(self):
+        if self.lost.is_set():
+            raise LeaseLost()
+
+
+def run_lease(
+    db: Session,
+    lease: models.ScrapeLease,
+    ttl_s: float = SCRAPE_LEASE_TTL_S,
+    transport: ScraperTransport = None,
+):
+    """
+    Scrape one leased page range and write it through the ingest path:
+    full jobs load it into the job's staging table, incremental jobs upsert
+    it directly. The worker completing the last lease finalizes the job.
+    transport, when given, is the worker's HTTP transport, kept across
+    leases so its connections stay open.
+    """
+    job = crud.get_scrape_job(db, lease.job_id)
+    with LeaseHeartbeat(lease, ttl_s) as heartbeat:
+        written = _scrape_lease(db, job, lease, ttl_s, heartbeat, transport)
+    if transport is not None:
+        logger.info("Lease %s transport stats: %s", lease.id, transport.stats())
+    if written is None:
+        return
+
+    if crud.complete_scrape_lease(db, lease, written):
+        try:
+            crud.finalize_scrape_job(db, lease.job_id)
+        except Exception as exc:
+            logger.exception("Could not finalize scraping job %s", lease.job_id)
+            crud.finish_scrape_job(
+                db, lease.job_id, "failed", f"{type(exc).__name__}: {exc}"
+            )
+
+
+def _scrape_lease(
+    db: Session,
+    job: models.ScrapeJob,
+    lease: models.ScrapeLease,
+    ttl_s: float,
+    heartbeat: LeaseHeartbeat,
+    transport: ScraperTransport = None,
+):
+    """
+    Scrape and write a lease's pages. Returns the number of books written,
+    or None if the lease was lost, cancelled or failed.
+    """
+
+    def keep_alive():
+        if stopping.is_set():
+            raise WorkerStopping()
+        heartbeat.check()
+        if not crud.renew_scrape_lease(db, lease, ttl_s):
+            raise LeaseLost()
+
+    try:
+        if job.mode == "incremental":
+            result = scraping.scrape_books_incremental(
+                pages=lease.page_count,
+                start_page=lease.page_start,
+                state=crud.get_scrape_state(db),
+                transport=transport,
+            )
+            keep_alive()
+            crud.upsert_books(db, result.books)
+            crud.save_scrape_state(db, result.state)
+            written = len(result.books)
+        else:
+            ingest = crud.job_ingest(db, job.id, partition=lease.claim_token)
+
+            def write(batch: List[schemas.BookCreate]):
+                ingest.write(batch)
+                keep_alive()
+
+            written = run_pipeline(
+                scraping.iter_books(
+                    pages=lease.page_count,
+                    start_page=lease.page_start,
+                    transport=transport,
+                ),
+                write,
+            )
+    except WorkerStopping:
+        db.rollback()
+        logger.info("Stopping, returning lease %s", lease.id)
+        crud.return_scrape_lease(db, lease)
+        return None
+    except LeaseLost:
+        db.rollback()
+        job = crud.get_scrape_job(db, lease.job_id)
+        if job.cancel_requested:
+            crud.finish_scrape_job(db, job.id, "cancelled")
+        return None
+    except Exception as exc:
+        db.rollback()
+        logger.exception("Lease %s of scraping job %s failed", lease.id, job.id)
+        crud.release_scrape_lease(db, lease, f"{type(exc).__name__}: {exc}")
+        return None
+    return written
+
+
+def work():
+    """
+    Poll for leases forever.
+    """
+    # Never share pooled connections inherited from a parent process.
+    engine.dispose(close=False)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    transport = ScraperTransport(
+        pool_size=scraping.SCRAPE_CONCURRENCY,
+        per_host_limit=scraping.SCRAPE_PER_HOST_LIMIT,
+    )
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    while not stopping.is_set():
+        db = SessionLocal()
+        try:
+            crud.expire_stale_scrape_jobs(db)
+            lease = crud.claim_scrape_lease(db, worker_id, SCRAPE_LEASE_TTL_S)
+            if lease is not None:
+                run_lease(db, lease, transport=transport)
+                continue
+        finally:
+            db.close()
+        stopping.wait(WORKER_POLL_S)
+    logger.info("Worker stopped")
+
+
+def _stop(signum, frame):
+    stopping.set()
+
+
+def main():
+    """
+    Run one worker, or N local worker processes with --processes N.
+    """
+    parser = argparse.ArgumentParser(description="Scraping worker")
+    parser.add_argument("--processes", type=int, default=WORKER_PROCESSES)
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(processName)s %(levelname)s %(message)s",
+    )
+    migrate(engine)
+    if args.processes <= 1:
+        work()
+        return
+    procs = [
+        multiprocessing.Process(target=work, name=f"scrape-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for proc in procs:
+        proc.start()
+
+    def stop(signum, frame):
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+
+    # Installed after the children started, which keep their own handlers.
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for proc in procs:
+        proc.join()
+
+
+if __name__ == "__main__":
+    main()
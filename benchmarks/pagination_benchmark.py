@@ -0,0 +1,121 @@
+"""
+Benchmark for /api/v1/books/ pagination strategies.
+Fills a scratch SQLite database with synthetic books and times fetching
+page N with skip/limit (OFFSET) and with cursors (keyset), for each sort.
+
+Usage:
+    python -m benchmarks.pagination_benchmark [--rows 200000] [--limit 50]
+        [--database sqlite:///pagination_benchmark.db]
+
+Keyset pages should cost the same at any depth; OFFSET pages grow linearly.
+"""
+
+import argparse
+import random
+import time
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+from app import crud, models
+
+DEPTHS = [0, 10, 100, 1000, 3000]
+
+
+def fill(db: Session, rows: int):
+    """
+    Insert synthetic books until the table holds the requested row count.
+    """
+    existing = db.scalar(select(func.count(models.Book.id)))
+    rng = random.Random(42)
+    batch = []
+    for i in range(existing, rows):
+        price = round(rng.uniform(10, 60), 2)
+        batch.append(
+            {
+                "title": f"Book {rng.randrange(rows):08d}",
+                "category": f"Category {i % 50}",
+                "rating": rng.randint(1, 5),
+                "description": "",
+                "upc": f"bench-{i:09d}",
+                "product_type": "Books",
+                "price_excl_tax": price,
+                "price_incl_tax": price,
+                "tax": 0.0,
+                "num_available": rng.randint(0, 20),
+                "num_reviews": 0,
+                "image_url": "",
+            }
+        )
+        if len(batch) == 10000:
+            db.execute(insert(models.Book), batch)
+            batch = []
+    if batch:
+        db.execute(insert(models.Book), batch)
+    db.commit()
+
+
+def time_offset(db: Session, sort: str, page: int, limit: int) -> float:
+    """
+    Seconds to fetch page N with OFFSET.
+    """
+    start = time.perf_counter()
+    db.scalars(crud.books_page_statement(sort, limit=limit, skip=page * limit)).all()
+    return time.perf_counter() - start
+
+
+def cursor_for_page(db: Session, sort: str, page: int, limit: int) -> str:
+    """
+    Cursor of page N, as a client walking the pages would hold it.
+    """
+    if page == 0:
+        return None
+    books = db.scalars(
+        crud.books_page_statement(sort, limit=limit, skip=page * limit - 1)
+    ).all()
+    return crud.encode_cursor(sort, False, books[0])
+
+
+def time_keyset(db: Session, sort: str, cursor: str, limit: int) -> float:
+    """
+    Seconds to fetch the page after a cursor.
+    """
+    start = time.perf_counter()
+    db.scalars(crud.books_page_statement(sort, cursor=cursor, limit=limit)).all()
+    return time.perf_counter() - start
+
+
+def main():
+    """
+    Run the benchmark and print a table of page latencies in ms.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--rows", type=int, default=200000)
+    arg_parser.add_argument("--limit", type=int, default=50)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--database", default="sqlite:///pagination_benchmark.db")
+    args = arg_parser.parse_args()
+
+    engine = create_engine(args.database)
+    models.Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        fill(db, args.rows)
+        depths = [d for d in DEPTHS if d * args.limit < args.rows]
+        print(f"{args.rows} rows, {args.limit} per page, best of {args.repeat}")
+        print(f"{'sort':<7} {'page':>6} {'offset ms':>10} {'keyset ms':>10}")
+        for sort in crud.BOOK_SORT_KEYS:
+            for page in depths:
+                cursor = cursor_for_page(db, sort, page, args.limit)
+                offset_s = min(
+                    time_offset(db, sort, page, args.limit) for _ in range(args.repeat)
+                )
+                keyset_s = min(
+                    time_keyset(db, sort, cursor, args.limit)
+                    for _ in range(args.repeat)
+                )
+                print(
+                    f"{sort:<7} {page:>6} {offset_s * 1000:>10.2f} "
+                    f"{keyset_s * 1000:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark for the scraper parser backends.
+Parses a corpus of saved books.toscrape.com product pages with each backend
+and reports pages/sec and peak memory. Throughput is timed in a pass of its
+own; Python allocations are then traced (tracemalloc) in a separate pass,
+since tracing slows every allocation down. tracemalloc does not see lxml's
+C allocations, so the RSS growth of the timed pass is reported as well.
+
+Usage:
+    python -m benchmarks.parser_benchmark <corpus_dir> [--repeat 3]
+
+The corpus directory is either a site mirror, searched recursively for
+product pages (catalogue/<slug>/index.html), or a page cache directory
+(SCRAPE_CACHE_DIR, see app.page_cache), read through its manifest.
+"""
+
+import argparse
+import multiprocessing
+import resource
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List
+from app.page_cache import PageCache
+from app.parsers import PARSERS, get_parser
+
+
+def is_product_page(path: str) -> bool:
+    """
+    Whether a URL or file path is a product page (not a listing page).
+    """
+    parts = path.split("/")
+    return (
+        parts[-1] == "index.html" and "catalogue" in parts and "category" not in parts
+    )
+
+
+def load_corpus(corpus_dir: str) -> List[str]:
+    """
+    Load every product page found under the corpus directory.
+    """
+    if (Path(corpus_dir) / PageCache.MANIFEST).exists():
+        cache = PageCache(corpus_dir)
+        pages = (cache.get(url) for url in sorted(cache.urls) if is_product_page(url))
+        return [html for html in pages if html is not None]
+    return [
+        path.read_text(encoding="utf-8")
+        for path in sorted(Path(corpus_dir).rglob("index.html"))
+        if is_product_page(path.as_posix())
+    ]
+
+
+def run_backend(name: str, pages: List[str], repeat: int, queue):
+    """
+    Parse the corpus with one backend (in its own process) and report timings.
+    """
+    parser = get_parser(name)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            parser.parse_book(html, "https://books.toscrape.com/")
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tracemalloc.start()
+    for html in pages:
+        parser.parse_book(html, "https://books.toscrape.com/")
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    queue.put(
+        {
+            "backend": name,
+            "pages_per_sec": len(pages) * repeat / elapsed,
+            "py_peak_kb": py_peak / 1024,
+            "rss_growth_kb": rss_after - rss_before,
+        }
+    )
+
+
+def main():
+    """
+    Run the benchmark for all installed backends and print a table.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("corpus_dir")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    pages = load_corpus(args.corpus_dir)
+    if not pages:
+        raise SystemExit(f"No product pages found under {args.corpus_dir}")
+
+    print(f"{len(pages)} pages x {args.repeat} repeats")
+    print(f"{'backend':<8} {'pages/sec':>10} {'py peak KB':>11} {'rss +KB':>9}")
+    queue = multiprocessing.Queue()
+    for name in PARSERS:
+        proc = multiprocessing.Process(
+            target=run_backend, args=(name, pages, args.repeat, queue)
+        )
+        proc.start()
+        result = queue.get()
+        proc.join()
+        print(
+            f"{result['backend']:<8} {result['pages_per_sec']:>10.1f} "
+            f"{result['py_peak_kb']:>11.0f} {result['rss_growth_kb']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark for book list serialization and response compression.
+Fills a scratch SQLite database with synthetic books (with realistic
+description lengths) and, for each page size, compares:
+
+- pydantic: ORM entities validated through List[BookBase] and encoded by
+  JSONResponse, as FastAPI does with a response_model;
+- fast: row tuples turned into dicts and encoded by app.fast_json.
+
+It reports fetch + serialize and serialize-only times, and the body size
+uncompressed, gzipped and brotli-compressed (as app.compression sends it).
+
+Usage:
+    python -m benchmarks.serialization_benchmark [--rows 20000]
+        [--repeat 5] [--database sqlite:///serialization_benchmark.db]
+"""
+
+import argparse
+import gzip
+import random
+import statistics
+import time
+from typing import Callable, List
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+from app import crud, models, schemas
+from app.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli
+from app.fast_json import book_dicts, book_rows_statement, dumps, orjson
+
+PAGE_SIZES = [100, 1000]
+
+WORDS = (
+    "the book story life world love time new first young family house war "
+    "novel history art about author years city woman man death secret power"
+).split()
+
+
+def fill(db: Session, rows: int):
+    """
+    Insert synthetic books until the table holds the requested row count.
+    """
+    existing = db.scalar(select(func.count(models.Book.id)))
+    rng = random.Random(42)
+    batch = []
+    for i in range(existing, rows):
+        price = round(rng.uniform(10, 60), 2)
+        batch.append(
+            {
+                "title": " ".join(rng.choices(WORDS, k=rng.randint(2, 6))).title(),
+                "category": f"Category {i % 50}",
+                "rating": rng.randint(1, 5),
+                "description": " ".join(rng.choices(WORDS, k=rng.randint(80, 250))),
+                "upc": f"{rng.getrandbits(64):016x}",
+                "product_type": "Books",
+                "price_excl_tax": price,
+                "price_incl_tax": price,
+                "tax": 0.0,
+                "num_available": rng.randint(0, 20),
+                "num_reviews": 0,
+                "image_url": f"https://books.toscrape.com/media/cache/{i:08x}.jpg",
+            }
+        )
+        if len(batch) == 10000:
+            db.execute(insert(models.Book), batch)
+            batch = []
+    if batch:
+        db.execute(insert(models.Book), batch)
+    db.commit()
+
+
+def best_ms(function: Callable, repeat: int) -> float:
+    """
+    Median wall time of a function in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization benchmark")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database", default="sqlite:///serialization_benchmark.db")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database)
+    models.Base.metadata.create_all(engine)
+    books_adapter = TypeAdapter(List[schemas.BookBase])
+    print(f"encoder: {'orjson' if orjson else 'json'}, brotli: {bool(brotli)}")
+    with Session(engine) as db:
+        fill(db, args.rows)
+        print(
+            f"{'limit':>6} {'path':<9} {'fetch+ser ms':>13} {'ser ms':>8}"
+            f" {'bytes':>9} {'gzip':>8} {'br':>8}"
+        )
+        for limit in PAGE_SIZES:
+            stmt = crud.price_range_statement(skip=0, limit=limit)
+
+            def pydantic_body(books) -> bytes:
+                validated = books_adapter.validate_python(books, from_attributes=True)
+                return JSONResponse(
+                    books_adapter.dump_python(validated, mode="json")
+                ).body
+
+            def pydantic_path() -> bytes:
+                db.expunge_all()
+                return pydantic_body(db.scalars(stmt).all())
+
+            def fast_path() -> bytes:
+                return dumps(book_dicts(db.execute(book_rows_statement(stmt))))
+
+            db.expunge_all()
+            entities = db.scalars(stmt).all()
+            rows = db.execute(book_rows_statement(stmt)).all()
+            paths = {
+                "pydantic": (pydantic_path, lambda: pydantic_body(entities)),
+                "fast": (fast_path, lambda: dumps(book_dicts(rows))),
+            }
+            for name, (full, serialize_only) in paths.items():
+                body = full()
+                gzipped = len(gzip.compress(body, compresslevel=GZIP_LEVEL))
+                brotlied = (
+                    len(brotli.compress(body, quality=BROTLI_QUALITY)) if brotli else 0
+                )
+                print(
+                    f"{limit:>6} {name:<9} {best_ms(full, args.repeat):>13.2f}"
+                    f" {best_ms(serialize_only, args.repeat):>8.2f}"
+                    f" {len(body):>9} {gzipped:>8} {brotlied:>8}"
+                )
+
+
+if __name__ == "__main__":
+    main()
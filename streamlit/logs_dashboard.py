@@ -5,9 +5,8 @@ Shows request volume (2xx vs non-2xx) and average response time per endpoint.
 """
 
 import streamlit as st
-from datetime import date, datetime, time
+from datetime import date, datetime, time, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 import pandas as pd
 import plotly.express as px
 from app.database import SessionLocal
@@ -33,9 +32,11 @@ def fetch_logs(
     Fetch logs from the database applying all filters.
     """
     query = db.query(RequestLog)
+    # Whole days, as a plain range on created_ts so its index can be used
     query = query.filter(
-        func.date(RequestLog.created_ts) >= start_datetime.date(),
-        func.date(RequestLog.created_ts) <= end_datetime.date(),
+        RequestLog.created_ts >= datetime.combine(start_datetime.date(), time.min),
+        RequestLog.created_ts
+        < datetime.combine(end_datetime.date() + timedelta(days=1), time.min),
     )
     if method != "All":
         query = query.filter(RequestLog.http_method == method)
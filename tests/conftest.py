@@ -0,0 +1,80 @@
+"""
+Shared test setup. The app modules read DATABASE_URL at import time, so it
+points at a throwaway SQLite database before any of them is imported.
+"""
+
+import os
+import tempfile
+import pytest
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+
+
+@pytest.fixture(scope="session")
+def engine():
+    from app.database import engine
+    from app.migrations import migrate
+
+    migrate(engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def make_book():
+    from app.schemas import BookCreate
+
+    def make(number: int, **fields) -> BookCreate:
+        values = {
+            "title": f"Book {number}",
+            "category": "Poetry",
+            "rating": 3,
+            "description": f"Description of book {number}",
+            "upc": f"upc{number:06d}",
+            "product_type": "Books",
+            "price_excl_tax": 10.0 + number,
+            "price_incl_tax": 10.0 + number,
+            "tax": 0.0,
+            "num_available": 1,
+            "num_reviews": 0,
+            "image_url": f"https://example.com/{number}.jpg",
+        }
+        return BookCreate(**{**values, **fields})
+
+    return make
+
+
+@pytest.fixture
+def catalog(db, make_book):
+    """
+    Replace tb_books with 50 books. Prices, ratings and titles repeat, so
+    orderings need their id tie-breaker.
+    """
+    from sqlalchemy import delete
+    from app import crud, models
+
+    db.execute(delete(models.Book))
+    db.commit()
+    books = [
+        make_book(
+            number,
+            title=f"Title {number % 7}",
+            category=("Poetry", "Travel", "Mystery")[number % 3],
+            rating=number % 5 + 1,
+            price_incl_tax=float(5 + number % 11 * 5),
+            num_available=number % 4,
+        )
+        for number in range(50)
+    ]
+    crud.upsert_books(db, books)
+    return db.scalars(crud.books_statement(0, None)).all()
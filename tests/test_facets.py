@@ -0,0 +1,128 @@
+"""
+Faceted query tests: bitmap index results and counts against a brute-force
+filter of the same books (see app.facets).
+"""
+
+import asyncio
+import pytest
+from app import facets
+from app.database import AsyncSessionLocal, async_engine
+
+
+def bucket(price: float) -> str:
+    index = sum(price >= bound for bound in facets.PRICE_BUCKETS)
+    return facets.bucket_label(index)
+
+
+def brute_force(books, categories, ratings, min_price, max_price, available):
+    checks = {
+        "category": lambda book: not categories or book.category in categories,
+        "rating": lambda book: not ratings or book.rating in ratings,
+        "price": lambda book: (min_price is None or book.price_incl_tax >= min_price)
+        and (max_price is None or book.price_incl_tax <= max_price),
+        "available": lambda book: available is None
+        or (book.num_available > 0) == available,
+    }
+
+    def matching(skip_facet=None):
+        return [
+            book
+            for book in books
+            if all(check(book) for name, check in checks.items() if name != skip_facet)
+        ]
+
+    def counts(facet, key):
+        result = {}
+        for book in matching(facet):
+            result[key(book)] = result.get(key(book), 0) + 1
+        return result
+
+    return matching(), {
+        "category": counts("category", lambda book: book.category),
+        "rating": counts("rating", lambda book: book.rating),
+        "price": counts("price", lambda book: bucket(book.price_incl_tax)),
+        "available": counts(
+            "available", lambda book: "true" if book.num_available > 0 else "false"
+        ),
+    }
+
+
+FILTERS = [
+    (None, None, None, None, None),
+    (["Poetry"], None, None, None, None),
+    (["Poetry", "Travel"], [1, 5], None, None, True),
+    (None, [3], 10.0, 40.0, None),
+    (["Mystery"], None, None, 25.0, False),
+    (["Unknown"], None, None, None, None),
+]
+
+
+def build_index(books) -> facets.FacetIndex:
+    return facets.FacetIndex(
+        [book.id for book in books],
+        [book.category for book in books],
+        [book.rating for book in books],
+        [book.price_incl_tax for book in books],
+        [book.num_available for book in books],
+    )
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_query_matches_brute_force(catalog, filters):
+    total, ids, counts = build_index(catalog).query(*filters, skip=0, limit=1000)
+
+    expected, expected_counts = brute_force(catalog, *filters)
+    by_price = sorted(expected, key=lambda book: (book.price_incl_tax, book.id))
+    assert total == len(expected)
+    assert ids == [book.id for book in by_price]
+    for facet, values in expected_counts.items():
+        assert {key: count for key, count in counts[facet].items() if count} == values
+
+
+def test_query_pages_in_price_order(catalog):
+    index = build_index(catalog)
+    _, everything, _ = index.query(limit=1000)
+    pages = [index.query(skip=skip, limit=8)[1] for skip in range(0, 56, 8)]
+    assert [book_id for page in pages for book_id in page] == everything
+
+
+def test_query_books_reads_the_database(catalog):
+    async def main():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await facets.query_books(
+                    db, categories=["Travel"], available=True, limit=5
+                )
+        finally:
+            await async_engine.dispose()
+
+    result = asyncio.run(main())
+    expected, counts = brute_force(catalog, ["Travel"], None, None, None, True)
+    assert result.total == len(expected)
+    assert [book.category for book in result.books] == ["Travel"] * 5
+    assert result.facets.category["Poetry"] == counts["category"]["Poetry"]
+
+
+def test_concurrent_requests_build_the_index_once(catalog, monkeypatch):
+    builds = []
+
+    class CountingIndex(facets.FacetIndex):
+        def __init__(self, *args, **kwargs):
+            builds.append(kwargs["version"])
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(facets, "FacetIndex", CountingIndex)
+
+    async def query():
+        async with AsyncSessionLocal() as db:
+            return await facets.query_books(db, ratings=[5])
+
+    async def main():
+        try:
+            return await asyncio.gather(*[query() for _ in range(10)])
+        finally:
+            await async_engine.dispose()
+
+    results = asyncio.run(main())
+    assert len(builds) == 1
+    assert {result.total for result in results} == {10}
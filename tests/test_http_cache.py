@@ -0,0 +1,56 @@
+"""
+Conditional GET tests through the ASGI app (see app.http_cache).
+"""
+
+import asyncio
+import httpx
+import pytest
+from sqlalchemy import event
+from app.database import SQLALCHEMY_DATABASE_URL, async_engine
+from app.main import app, lifespan
+from app.replicas import EngineHealth, create_replica_engine, read_router
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    # A "replica" of the same SQLite file, so reads route through connect().
+    health = EngineHealth(create_replica_engine(SQLALCHEMY_DATABASE_URL))
+    monkeypatch.setattr(read_router, "replicas", [health])
+    yield health
+    asyncio.run(health.engine.dispose())
+
+
+def test_not_modified_is_answered_without_a_connection(catalog, replica):
+    checkouts = []
+
+    def count(*args):
+        checkouts.append(args)
+
+    pools = [async_engine.sync_engine.pool, replica.engine.sync_engine.pool]
+
+    async def main():
+        async with lifespan(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                first = await client.get("/api/v1/categories")
+                for pool in pools:
+                    event.listen(pool, "checkout", count)
+                try:
+                    second = await client.get(
+                        "/api/v1/categories",
+                        headers={"If-None-Match": first.headers["ETag"]},
+                    )
+                finally:
+                    for pool in pools:
+                        event.remove(pool, "checkout", count)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first.status_code == 200
+    assert first.json() == ["Mystery", "Poetry", "Travel"]
+    assert replica.reads == 1
+    assert second.status_code == 304
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert checkouts == []
@@ -0,0 +1,31 @@
+"""
+Schema migration tests against a migrated SQLite database.
+"""
+
+import pytest
+from sqlalchemy import MetaData
+from app import models
+from app.migrations import status
+from app.migrations.__main__ import check_query, hot_queries
+
+
+def test_all_migrations_applied(engine):
+    assert all(applied for _, _, applied in status(engine))
+
+
+def test_migrated_schema_matches_models(engine):
+    migrated = MetaData()
+    migrated.reflect(bind=engine)
+    for table in models.Base.metadata.sorted_tables:
+        reflected = migrated.tables[table.name]
+        assert set(reflected.columns.keys()) == set(table.columns.keys())
+        assert {index.name for index in reflected.indexes} >= {
+            index.name for index in table.indexes
+        }
+
+
+@pytest.mark.parametrize("name", sorted(hot_queries()))
+def test_hot_query_uses_index(engine, name):
+    with engine.connect() as connection:
+        passed, plan = check_query(connection, hot_queries()[name])
+    assert passed, "\n".join(plan)
@@ -0,0 +1,55 @@
+"""
+Page cache tests: manifests of several instances sharing one directory.
+"""
+
+from app.page_cache import PageCache
+
+
+def stored_hashes(cache: PageCache) -> set:
+    return {path.name.split(".")[0] for path in cache.directory.glob("objects/*/*")}
+
+
+def test_flush_merges_instances(tmp_path):
+    first, second = PageCache(tmp_path), PageCache(tmp_path)
+    first.put("a", "<p>a</p>")
+    second.put("b", "<p>b</p>")
+    first.flush()
+    second.flush()
+
+    merged = PageCache(tmp_path)
+    assert (merged.get("a"), merged.get("b")) == ("<p>a</p>", "<p>b</p>")
+
+
+def test_flush_restores_object_evicted_by_another_instance(tmp_path):
+    seed = PageCache(tmp_path)
+    seed.put("old", "<p>shared</p>")
+    seed.flush()
+    writer, other = PageCache(tmp_path), PageCache(tmp_path)
+    # Already on disk, so the object is not written again...
+    writer.put("new", "<p>shared</p>")
+    # ...and the other instance deletes it once "old" no longer points at it.
+    other.put("old", "<p>changed</p>")
+    other.flush()
+    writer.flush()
+
+    cache = PageCache(tmp_path)
+    assert cache.get("new") == "<p>shared</p>"
+    assert cache.get("old") == "<p>changed</p>"
+    assert stored_hashes(cache) == set(cache.objects)
+
+
+def test_eviction_deletes_only_unreferenced_objects(tmp_path):
+    cache = PageCache(tmp_path)
+    for number in range(20):
+        cache.put(f"page-{number}", f"<p>{number}</p>" * 100)
+    cache.put("copy", "<p>19</p>" * 100)
+    cache.flush()
+
+    small = PageCache(tmp_path, max_bytes=cache.total_bytes() // 2)
+    small.put("last", "<p>last</p>")
+    small.flush()
+
+    assert small.total_bytes() <= small.max_bytes
+    assert stored_hashes(small) == set(small.objects)
+    assert all(small.get(url) is not None for url in small.urls)
+    assert small.get("copy") == small.get("page-19")
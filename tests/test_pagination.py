@@ -0,0 +1,111 @@
+"""
+Keyset pagination tests for the books listing (see app.crud).
+"""
+
+import asyncio
+import base64
+import json
+import httpx
+import pytest
+from app import crud
+from app.database import async_engine
+from app.main import app
+
+SORT_VALUES = {
+    "id": lambda book: (book.id,),
+    "price": lambda book: (book.price_incl_tax, book.id),
+    "rating": lambda book: (book.rating, book.id),
+    "title": lambda book: (book.title, book.id),
+}
+
+
+def walk(db, sort: str, descending: bool, limit: int):
+    books, cursor = crud.get_books_page(db, sort, descending, limit=limit)
+    pages = [books]
+    while cursor:
+        books, cursor = crud.get_books_page(db, sort, descending, cursor, limit)
+        pages.append(books)
+    return pages
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("sort", sorted(crud.BOOK_SORT_KEYS))
+def test_cursor_pages_cover_the_catalog_in_order(db, catalog, sort, descending):
+    pages = walk(db, sort, descending, limit=7)
+
+    expected = sorted(catalog, key=SORT_VALUES[sort], reverse=descending)
+    assert [book.id for page in pages for book in page] == [
+        book.id for book in expected
+    ]
+    assert all(len(page) == 7 for page in pages[:-1])
+
+
+def test_cursor_pages_match_offset_pages(db, catalog):
+    cursor_pages = walk(db, "price", False, limit=10)
+    for number, page in enumerate(cursor_pages):
+        offset_page, _ = crud.get_books_page(db, "price", skip=number * 10, limit=10)
+        assert [book.id for book in page] == [book.id for book in offset_page]
+
+
+def test_last_full_page_has_no_cursor_when_nothing_follows(db, catalog):
+    books, cursor = crud.get_books_page(db, "id", limit=len(catalog) + 1)
+    assert len(books) == len(catalog)
+    assert cursor is None
+
+
+def test_cursor_is_tied_to_its_sort_order(catalog):
+    cursor = crud.encode_cursor("price", False, catalog[0])
+    assert crud.decode_cursor(cursor, "price", False) == (
+        catalog[0].price_incl_tax,
+        catalog[0].id,
+    )
+    with pytest.raises(ValueError):
+        crud.decode_cursor(cursor, "price", True)
+    with pytest.raises(ValueError):
+        crud.decode_cursor(cursor, "rating", False)
+    with pytest.raises(ValueError):
+        crud.decode_cursor("not a cursor", "price", False)
+
+
+def forge_cursor(*payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+@pytest.mark.parametrize(
+    "sort, value",
+    [("id", "1"), ("price", "12.5"), ("price", True), ("rating", 4.5), ("title", 3)],
+)
+def test_cursor_value_must_match_the_sort_key_type(sort, value):
+    with pytest.raises(ValueError):
+        crud.decode_cursor(forge_cursor(sort, False, value, 1), sort, False)
+
+
+def test_cursor_accepts_integral_prices():
+    assert crud.decode_cursor(forge_cursor("price", False, 12, 1), "price", False) == (
+        12,
+        1,
+    )
+
+
+@pytest.mark.parametrize(
+    "params, status_code",
+    [
+        ({"limit": 0}, 422),
+        ({"limit": crud.MAX_PAGE_SIZE + 1}, 422),
+        ({"skip": -1}, 422),
+        ({"sort": "rating", "cursor": forge_cursor("rating", False, "5", 1)}, 400),
+        ({"limit": 5}, 200),
+    ],
+)
+def test_list_books_validates_limit_and_cursor(catalog, params, status_code):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            try:
+                return await client.get("/api/v1/books/", params=params)
+            finally:
+                await async_engine.dispose()
+
+    assert asyncio.run(main()).status_code == status_code
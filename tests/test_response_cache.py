@@ -0,0 +1,57 @@
+"""
+Dataset-versioned response cache tests (see app.response_cache).
+"""
+
+import asyncio
+from app.response_cache import ResponseCache
+
+
+def get_or_load(cache: ResponseCache, name: str, version: int, value):
+    loads = []
+
+    async def load():
+        loads.append(value)
+        return value
+
+    result = asyncio.run(cache.get_or_load(name, version, load))
+    return result, len(loads)
+
+
+def test_values_are_cached_per_dataset_version():
+    cache = ResponseCache(l2_path=None)
+    assert get_or_load(cache, "stats", 1, {"total": 1}) == ({"total": 1}, 1)
+    assert get_or_load(cache, "stats", 1, {"total": 2}) == ({"total": 1}, 0)
+    # A new ingest bumps the version: the old entry is never read again.
+    assert get_or_load(cache, "stats", 2, {"total": 2}) == ({"total": 2}, 1)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResponseCache(max_entries=2, l2_path=None)
+    get_or_load(cache, "a", 1, "a")
+    get_or_load(cache, "b", 1, "b")
+    get_or_load(cache, "a", 1, "a")
+    get_or_load(cache, "c", 1, "c")
+
+    assert get_or_load(cache, "a", 1, "new")[1] == 0
+    assert get_or_load(cache, "b", 1, "new") == ("new", 1)
+    assert cache.stats()["evictions"] == 2
+
+
+def test_expired_entries_are_reloaded():
+    cache = ResponseCache(ttl_s=0, l2_path=None)
+    get_or_load(cache, "stats", 1, "old")
+    assert get_or_load(cache, "stats", 1, "new") == ("new", 1)
+
+
+def test_shared_cache_serves_other_processes(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    first, second = ResponseCache(l2_path=path), ResponseCache(l2_path=path)
+    get_or_load(first, "categories", 3, ["Poetry"])
+
+    assert get_or_load(second, "categories", 3, ["other"]) == (["Poetry"], 0)
+    assert second.stats()["l2_hits"] == 1
+    # Entries of older versions are dropped when a newer one is stored.
+    get_or_load(second, "categories", 4, ["Travel"])
+    assert get_or_load(ResponseCache(l2_path=path), "categories", 3, ["x"])[1] == 1
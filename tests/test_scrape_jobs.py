@@ -0,0 +1,126 @@
+"""
+Scraping job and lease lifecycle tests against SQLite: claiming, renewal,
+expiry and finalization (see app.crud and app.worker).
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import delete, inspect, select, update
+from app import crud, models
+
+
+@pytest.fixture
+def jobs(db):
+    db.execute(delete(models.ScrapeLease))
+    db.execute(delete(models.ScrapeJob))
+    db.commit()
+    return db
+
+
+def test_create_splits_job_into_leases(jobs):
+    job, created = crud.create_scrape_job(jobs, pages=5, partition_pages=2)
+    assert created
+    leases = jobs.scalars(
+        select(models.ScrapeLease).order_by(models.ScrapeLease.page_start)
+    ).all()
+    assert [(lease.page_start, lease.page_count) for lease in leases] == [
+        (1, 2),
+        (3, 2),
+        (5, 1),
+    ]
+
+    again, created = crud.create_scrape_job(jobs, pages=5)
+    assert not created
+    assert again.id == job.id
+
+
+def test_claim_leases_each_range_once(jobs):
+    job, _ = crud.create_scrape_job(jobs, pages=2, partition_pages=1)
+    first = crud.claim_scrape_lease(jobs, "worker-a", ttl_s=60)
+    second = crud.claim_scrape_lease(jobs, "worker-b", ttl_s=60)
+
+    assert {first.page_start, second.page_start} == {1, 2}
+    assert first.claim_token != second.claim_token
+    assert crud.claim_scrape_lease(jobs, "worker-c", ttl_s=60) is None
+    assert crud.get_scrape_job(jobs, job.id).status == "running"
+
+
+def test_expired_lease_is_reclaimed(jobs):
+    crud.create_scrape_job(jobs, pages=1, partition_pages=1)
+    lost = crud.claim_scrape_lease(jobs, "worker-a", ttl_s=60)
+    assert crud.renew_scrape_lease(jobs, lost, ttl_s=60)
+    lost_token = lost.claim_token
+    jobs.execute(
+        update(models.ScrapeLease).values(
+            lease_expires_ts=datetime.utcnow() - timedelta(seconds=1)
+        )
+    )
+    jobs.commit()
+
+    reclaimed = crud.claim_scrape_lease(jobs, "worker-b", ttl_s=60)
+    assert reclaimed.id == lost.id
+    assert reclaimed.attempts == 2
+
+    # The first worker's token no longer matches: it must stop.
+    stale = models.ScrapeLease(
+        id=lost.id, job_id=lost.job_id, claim_token=lost_token, page_count=1
+    )
+    assert not crud.renew_scrape_lease(jobs, stale, ttl_s=60)
+    assert not crud.complete_scrape_lease(jobs, stale, books_written=1)
+
+
+def test_returned_lease_does_not_count_an_attempt(jobs):
+    crud.create_scrape_job(jobs, pages=1, partition_pages=1)
+    lease = crud.claim_scrape_lease(jobs, "worker-a", ttl_s=60)
+    crud.return_scrape_lease(jobs, lease)
+
+    again = crud.claim_scrape_lease(jobs, "worker-b", ttl_s=60)
+    assert again.id == lease.id
+    assert again.attempts == 1
+
+
+def test_finalize_swaps_in_completed_leases(jobs, make_book):
+    job, _ = crud.create_scrape_job(jobs, pages=2, partition_pages=1)
+    for number in range(2):
+        lease = crud.claim_scrape_lease(jobs, f"worker-{number}", ttl_s=60)
+        assert not crud.finalize_scrape_job(jobs, job.id)
+        ingest = crud.job_ingest(jobs, job.id, partition=lease.claim_token)
+        ingest.write([make_book(number * 10 + i) for i in range(3)])
+        assert crud.complete_scrape_lease(jobs, lease, books_written=3)
+
+    assert crud.finalize_scrape_job(jobs, job.id)
+    assert not crud.finalize_scrape_job(jobs, job.id)
+
+    job = crud.get_scrape_job(jobs, job.id)
+    assert (job.status, job.pages_done, job.books_written) == ("succeeded", 2, 6)
+    assert job.active_key is None
+    assert jobs.query(models.Book).count() == 6
+    staging = crud.job_ingest(jobs, job.id).staging.name
+    assert not inspect(jobs.get_bind()).has_table(staging)
+
+
+def test_finish_does_not_overwrite_a_finalized_job(jobs):
+    job, _ = crud.create_scrape_job(jobs, pages=1, partition_pages=1)
+    lease = crud.claim_scrape_lease(jobs, "worker-a", ttl_s=60)
+    crud.complete_scrape_lease(jobs, lease, books_written=0)
+    assert crud.finalize_scrape_job(jobs, job.id)
+
+    assert not crud.finish_scrape_job(jobs, job.id, "failed", "too late")
+    assert crud.get_scrape_job(jobs, job.id).status == "succeeded"
+
+
+def test_stale_job_expires_and_frees_the_active_slot(jobs):
+    job, _ = crud.create_scrape_job(jobs, pages=1, partition_pages=1)
+    crud.claim_scrape_lease(jobs, "worker-a", ttl_s=60)
+    jobs.execute(
+        update(models.ScrapeJob).values(
+            heartbeat_ts=datetime.utcnow() - timedelta(hours=1)
+        )
+    )
+    jobs.commit()
+
+    assert crud.expire_stale_scrape_jobs(jobs, stale_s=60) == 1
+    expired = crud.get_scrape_job(jobs, job.id)
+    assert expired.status == "failed"
+    assert "heartbeat" in expired.error
+    assert crud.create_scrape_job(jobs, pages=1)[1]
@@ -0,0 +1,194 @@
+"""
+Scraper tests against a local HTTP server serving saved pages of
+books.toscrape.com (tests/fixtures/site).
+"""
+
+import functools
+import gzip
+import threading
+import time
+from http.server import (
+    BaseHTTPRequestHandler,
+    SimpleHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from pathlib import Path
+import pytest
+from app.page_cache import PageCache
+from app.parsers import PARSERS
+from app.scraping import iter_books, scrape_books, scrape_books_incremental
+from app.transport import ScraperTransport
+
+FIXTURE_SITE = Path(__file__).parent / "fixtures" / "site"
+PRODUCT_PAGE = (
+    FIXTURE_SITE / "catalogue/a-light-in-the-attic_1000/index.html"
+).read_bytes()
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture(scope="module")
+def site_url():
+    server = serve(functools.partial(QuietHandler, directory=str(FIXTURE_SITE)))
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+class LargeListingHandler(BaseHTTPRequestHandler):
+    """
+    One listing page of PRODUCTS links, each served with a short delay as a
+    copy of a saved product page; records requests and peak concurrency.
+    """
+
+    PRODUCTS = 30
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+    product_requests = 0
+
+    def do_GET(self):
+        cls = type(self)
+        if self.path.endswith("page-1.html"):
+            body = "".join(
+                f'<article class="product_pod"><h3><a href="book-{number}/index.html"'
+                f' title="Book {number}">Book {number}</a></h3></article>'
+                for number in range(cls.PRODUCTS)
+            ).encode()
+        else:
+            with cls.lock:
+                cls.in_flight += 1
+                cls.peak = max(cls.peak, cls.in_flight)
+                cls.product_requests += 1
+            time.sleep(0.02)
+            with cls.lock:
+                cls.in_flight -= 1
+            body = PRODUCT_PAGE
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def large_site():
+    handler = type("Handler", (LargeListingHandler,), {})
+    server = serve(handler)
+    yield f"http://127.0.0.1:{server.server_port}/", handler
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("parser", sorted(PARSERS))
+def test_scrape_books_from_local_site(site_url, parser):
+    books = scrape_books(pages=2, site_url=site_url, parser=parser, concurrency=4)
+
+    assert [book.title for book in books] == [
+        "A Light in the Attic",
+        "Tipping the Velvet",
+        "Soumission",
+    ]
+    first = books[0]
+    assert first.category == "Poetry"
+    assert first.rating == 3
+    assert first.upc == "a897fe39b1053632"
+    assert first.price_incl_tax == 51.77
+    assert first.num_available == 22
+    assert first.description.startswith("It's hard to imagine")
+    assert books[2].num_reviews == 1
+
+
+def test_incremental_scrape_skips_unchanged_pages(site_url):
+    first = scrape_books_incremental(pages=2, site_url=site_url)
+    assert len(first.books) == 3
+    assert first.pages_unchanged == 0
+
+    # The server answers If-Modified-Since with 304 for unchanged files.
+    second = scrape_books_incremental(pages=2, site_url=site_url, state=first.state)
+    assert second.books == []
+    assert second.pages_unchanged == 2
+
+
+@pytest.mark.parametrize("concurrency,per_host_limit", [(2, 8), (8, 3)])
+def test_requests_in_flight_are_capped(large_site, concurrency, per_host_limit):
+    url, handler = large_site
+    books = scrape_books(
+        pages=1, site_url=url, concurrency=concurrency, per_host_limit=per_host_limit
+    )
+
+    assert len(books) == handler.PRODUCTS
+    assert 1 < handler.peak <= min(concurrency, per_host_limit)
+
+
+def test_iter_books_fetches_ahead_only_within_its_window(large_site):
+    url, handler = large_site
+    books = iter_books(pages=1, site_url=url, concurrency=2)
+    next(books)
+    time.sleep(0.2)
+    # At most 2 * concurrency product pages are submitted ahead of the consumer.
+    assert handler.product_requests <= 4
+    books.close()
+
+
+def test_replay_rebuilds_books_from_the_page_cache(tmp_path):
+    server = serve(functools.partial(QuietHandler, directory=str(FIXTURE_SITE)))
+    url = f"http://127.0.0.1:{server.server_port}/"
+    scraped = scrape_books(pages=2, site_url=url, cache=PageCache(tmp_path))
+    # Replay must not touch the network.
+    server.shutdown()
+    server.server_close()
+
+    replayed = scrape_books(
+        pages=2, site_url=url, cache=PageCache(tmp_path), replay=True
+    )
+    assert len(scraped) == 3
+    assert replayed == scraped
+
+
+def test_replay_requires_cached_pages(site_url, tmp_path):
+    with pytest.raises(ValueError):
+        scrape_books(pages=1, site_url=site_url, replay=True)
+    with pytest.raises(LookupError):
+        scrape_books(pages=3, site_url=site_url, cache=PageCache(tmp_path), replay=True)
+
+
+class GzipHandler(BaseHTTPRequestHandler):
+    body = gzip.compress(PRODUCT_PAGE)
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_transport_counts_bytes_on_the_wire():
+    server = serve(GzipHandler)
+    transport = ScraperTransport()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/"
+        assert transport.get_text(url) == PRODUCT_PAGE.decode()
+        transport.get(url)
+    finally:
+        transport.close()
+        server.shutdown()
+        server.server_close()
+    assert transport.stats()["bytes_fetched"] == 2 * len(GzipHandler.body)
@@ -0,0 +1,106 @@
+"""
+Request coalescing tests (see app.singleflight).
+"""
+
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app.singleflight import SingleFlight, coalesce, singleflight
+
+
+def session(url: str):
+    # coalesce only reads the session's engine URL
+    return SimpleNamespace(bind=SimpleNamespace(url=url))
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return ["result"]
+
+    async def main():
+        return await asyncio.gather(*[flight.do("key", load) for _ in range(10)])
+
+    results = asyncio.run(main())
+    assert loads == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats()["coalesced"] == 9
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_errors_reach_every_caller_and_are_not_cached():
+    flight = SingleFlight()
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            *[flight.do("key", load) for _ in range(3)], return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert loads == 1
+    asyncio.run(main())
+    assert loads == 2
+
+
+def test_follower_takes_over_when_the_leader_is_cancelled():
+    flight = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        leader = asyncio.create_task(flight.do("key", load))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", load))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "done"
+    assert flight.stats()["executed"] == 2
+
+
+def test_coalesce_keys_by_arguments_and_engine():
+    calls = []
+
+    @coalesce
+    async def read(db, value, limit=10):
+        calls.append((db.bind.url, value, limit))
+        await asyncio.sleep(0.01)
+        return value
+
+    primary, replica = session("sqlite:///primary.db"), session("sqlite:///replica.db")
+
+    async def main():
+        return await asyncio.gather(
+            read(primary, 1),
+            read(primary, 1),
+            read(primary, 1, limit=5),
+            read(primary, 2),
+            read(replica, 1),
+        )
+
+    assert asyncio.run(main()) == [1, 1, 1, 2, 1]
+    assert sorted(calls) == [
+        ("sqlite:///primary.db", 1, 5),
+        ("sqlite:///primary.db", 1, 10),
+        ("sqlite:///primary.db", 2, 10),
+        ("sqlite:///replica.db", 1, 10),
+    ]
+    assert singleflight.stats()["in_flight"] == 0